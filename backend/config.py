@@ -5,6 +5,33 @@ load_dotenv()
 
 ENV = os.getenv("ENV", "DEV")  # "DEV" or "LIVE"
 
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")  # "json" or "sqlite"
+SQLITE_PATH = os.getenv("SQLITE_PATH", "models/data.db")
+
+# Point at a local stub server to exercise the AI endpoints offline
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+# Seconds /interview waits for the model before serving a pooled question
+INTERVIEW_LATENCY_BUDGET = float(os.getenv("INTERVIEW_LATENCY_BUDGET", "2.0"))
+
+# Approximate tokens of interview history sent with each follow-up question
+INTERVIEW_CONTEXT_TOKENS = int(os.getenv("INTERVIEW_CONTEXT_TOKENS", "600"))
+
+# Workers running queued side effects (notifications) in the background
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "4"))
+
+# Most status updates PUT /applications/status accepts in one request
+BULK_UPDATE_LIMIT = int(os.getenv("BULK_UPDATE_LIMIT", "1000"))
+
+# Responses at least this many bytes are sent gzip/brotli compressed
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+
+# Unix socket the uvicorn workers use to share WebSocket events, e.g.
+# /tmp/ai-interview-pubsub.sock. Required when running more than one worker,
+# which also requires STORAGE_BACKEND=sqlite: the JSON backend keeps ids and
+# records in each process's memory, so workers would overwrite each other.
+PUBSUB_SOCKET = os.getenv("PUBSUB_SOCKET", "")
+
 CONFIG = {
     "DEV": {
         "API_BASE_URL": "http://127.0.0.1:8000",
@@ -1,14 +1,41 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-import json
 import os
 import asyncio
-from utils.ai_interview import ask_ai_question
+from config import BULK_UPDATE_LIMIT
+from utils.ai_interview import ask_ai_question, stream_ai_question, question_pool
+from utils.analytics import analytics
+from utils.codec import dumps
+from utils.compression import CompressionMiddleware
+from utils.connection_manager import ConnectionManager
+from utils.etags import etag, not_modified, not_modified_response, tagged
+from utils.pubsub import create_pubsub
+from utils.interview_session import (
+    get_session, get_session_by_id, load_session, start_session, history_context, record_turn,
+    asked_questions
+)
+from utils.job_index import job_index
+from utils.job_search import job_search_index, job_summary
+from utils.llm_client import close_llm_client
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+from utils.projection import parse_fields, project, wants
+from utils.responses import FastJSONResponse, FastJSONRoute
+from utils.scoring import score_answers, rescore_interviews
+from utils.skill_index import skill_index
+from utils.task_queue import task_queue
+from utils.storage import (
+    DATA_FOLDER, get_collection, load_collections, flush_collections,
+    read_json_file, write_json_file, insert_record, insert_records, update_record,
+    update_records, delete_record, reset_sequences, StorageError, DuplicateError
+)
 
-app = FastAPI()
+# Endpoint results are encoded with orjson directly (see utils/responses.py)
+app = FastAPI(default_response_class=FastJSONResponse)
+app.router.route_class = FastJSONRoute
 
 # ------------------------
 # CORS Configuration
@@ -21,6 +48,9 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# Large JSON responses are sent gzip/brotli compressed
+app.add_middleware(CompressionMiddleware)
+
 # ------------------------
 # Data Models
 # ------------------------
@@ -60,6 +90,13 @@ class Profile(BaseModel):
 class InterviewQuestion(BaseModel):
     job_role: str
     answer: Optional[str] = ""
+    # Keeps the question/answer history on the server for this application,
+    # or in a practice session started with POST /interview/session
+    application_id: Optional[str] = None
+    session_id: Optional[str] = None
+
+class PracticeSession(BaseModel):
+    job_role: str
 
 class Notification(BaseModel):
     user_email: str
@@ -75,115 +112,121 @@ class StatusUpdate(BaseModel):
     message: Optional[str] = ""
     updated_by: str
 
+class BulkStatusUpdate(BaseModel):
+    updates: List[StatusUpdate]
+
 class InterviewCreate(BaseModel):
     candidate_email: str
     job_id: str
     application_id: str
-    score: float
-    max_score: float
-    percentage: float
-    performance: str
+    # Ignored: the score is computed server-side from the answers
+    score: Optional[float] = None
+    max_score: Optional[float] = None
+    percentage: Optional[float] = None
+    performance: Optional[str] = None
     answers: List[Dict[str, Any]]
     time_taken: int
 
 # ------------------------
 # WebSocket Connection Manager
 # ------------------------
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-    
-    async def connect(self, websocket: WebSocket, user_email: str):
-        await websocket.accept()
-        self.active_connections[user_email] = websocket
-    
-    def disconnect(self, user_email: str):
-        if user_email in self.active_connections:
-            del self.active_connections[user_email]
-    
-    async def send_personal_message(self, message: str, user_email: str):
-        if user_email in self.active_connections:
-            try:
-                await self.active_connections[user_email].send_text(message)
-            except:
-                self.disconnect(user_email)
-    
-    async def broadcast(self, message: str):
-        for connection in self.active_connections.values():
-            try:
-                await connection.send_text(message)
-            except:
-                pass
-
-manager = ConnectionManager()
+manager = ConnectionManager(create_pubsub())
 
 # ------------------------
 # Data Folder & Helper Functions
 # ------------------------
-DATA_FOLDER = "models"
 if not os.path.exists(DATA_FOLDER):
     os.makedirs(DATA_FOLDER)
 
-def read_json_file(filename):
-    """Safely read JSON file"""
-    filepath = f"{DATA_FOLDER}/{filename}"
-    
-    if not os.path.exists(filepath):
-        return []
-    
-    try:
-        with open(filepath, "r") as f:
-            content = f.read().strip()
-            if not content:
-                return []
-            data = json.loads(content)
-            if isinstance(data, list):
-                return data
-            else:
-                return [data]
-    except json.JSONDecodeError:
-        print(f"Error decoding JSON from {filepath}")
-        with open(filepath, "w") as f:
-            json.dump([], f)
-        return []
-    except Exception as e:
-        print(f"Error reading file {filepath}: {str(e)}")
-        return []
+def get_next_id(filename):
+    """Get next ID for new entry"""
+    return get_collection(filename).next_id()
 
-def write_json_file(filename, data):
-    """Safely write JSON file"""
-    filepath = f"{DATA_FOLDER}/{filename}"
-    
+def latest_interview_summaries(application_ids):
+    """Score summary of the most recent interview for each application"""
+    latest = {}
+    for interview in get_collection("interviews.json").find_in("application_id", application_ids):
+        app_id = interview.get("application_id")
+        current = latest.get(app_id)
+        if current is None or interview.get("completed_at", "") > current.get("completed_at", ""):
+            latest[app_id] = interview
+    return {app_id: interview_summary(latest_interview) for app_id, latest_interview in latest.items()}
+
+def interview_summary(interview):
+    """The score fields of an interview shown next to its application"""
+    return {
+        "score": interview.get("score"),
+        "max_score": interview.get("max_score"),
+        "percentage": interview.get("percentage"),
+        "performance": interview.get("performance"),
+        "completed_at": interview.get("completed_at")
+    }
+
+def records_by(records, field):
+    """Map field value -> first record with that value"""
+    mapping = {}
+    for record in records:
+        mapping.setdefault(record.get(field), record)
+    return mapping
+
+def read_page(filename, field, value, order_by, limit, cursor, keep=None):
+    """
+    One page of a collection's sorted index (see SORTED_INDEXES) as
+    (records, next_cursor). Records failing ``keep`` are skipped without
+    making the page shorter.
+    """
+    limit = DEFAULT_PAGE_SIZE if limit is None else limit
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    collection = get_collection(filename)
+    page = []
     try:
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error writing file {filepath}: {str(e)}")
-        return False
+        after = decode_cursor(cursor) if cursor else None
+        while True:
+            records, after = collection.page(field, value, order_by, limit - len(page), after)
+            page.extend(r for r in records if keep is None or keep(r))
+            if len(page) >= limit or after is None:
+                break
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return page, encode_cursor(after)
 
-def get_next_id(filename):
-    """Get next ID for new entry"""
-    data = read_json_file(filename)
-    if not data:
-        return "1"
+def field_projection(fields):
+    """Projection tree for a ``fields`` query parameter (see utils.projection)"""
     try:
-        ids = [int(item.get("id", 0)) for item in data if isinstance(item, dict) and "id" in item]
-        return str(max(ids) + 1) if ids else "1"
-    except:
-        return str(len(data) + 1)
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.on_event("startup")
+async def startup():
+    # Rebuild journaled collections before the first request comes in
+    load_collections()
+    await manager.start()
+    await task_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await task_queue.stop()
+    await manager.close()
+    flush_collections()
+    await close_llm_client()
 
 # ------------------------
 # WebSocket Endpoint
 # ------------------------
 @app.websocket("/ws/{user_email}")
 async def websocket_endpoint(websocket: WebSocket, user_email: str):
-    await manager.connect(websocket, user_email)
+    connection = await manager.connect(websocket, user_email)
     try:
         while True:
+            # Any message (including the client's "pong") keeps it alive
             await websocket.receive_text()
+            connection.touch()
     except WebSocketDisconnect:
-        manager.disconnect(user_email)
+        pass
+    finally:
+        manager.disconnect(connection)
 
 # ------------------------
 # AUTH ENDPOINTS
@@ -202,16 +245,19 @@ async def signup(user: User):
         if not user.name:
             user.name = user.email.split('@')[0]
         
-        users = read_json_file(f"{user_type}.json")
-        
-        for existing_user in users:
-            if existing_user.get("email") == user.email:
+        users = get_collection(f"{user_type}.json")
+        async with users.lock:
+            if users.find_one("email", user.email):
+                raise HTTPException(status_code=400, detail="Email already exists")
+            
+            user_dict = user.dict()
+            try:
+                saved = await insert_record(f"{user_type}.json", user_dict)
+            except DuplicateError:
+                # Registered through another worker in the meantime
                 raise HTTPException(status_code=400, detail="Email already exists")
         
-        user_dict = user.dict()
-        users.append(user_dict)
-        
-        if write_json_file(f"{user_type}.json", users):
+        if saved:
             return {
                 "message": "User registered successfully",
                 "user": {
@@ -265,48 +311,86 @@ async def login(user: User):
 # ------------------------
 # NOTIFICATION ENDPOINTS
 # ------------------------
-@app.post("/notifications")
-async def create_notification(notification: Notification):
-    """Create a new notification"""
-    try:
-        notifications = read_json_file("notifications.json")
-        
-        notification_dict = notification.dict()
-        notification_dict["id"] = get_next_id("notifications.json")
-        notification_dict["created_at"] = datetime.now().isoformat()
-        notification_dict["read"] = False
-        
-        notifications.append(notification_dict)
-        write_json_file("notifications.json", notifications)
-        
-        await manager.send_personal_message(
-            json.dumps({
+def build_notification(notification: Notification):
+    """Notification record with its id and timestamp assigned"""
+    notification_dict = notification.dict()
+    notification_dict["id"] = get_next_id("notifications.json")
+    notification_dict["created_at"] = datetime.now().isoformat()
+    notification_dict["read"] = False
+    return notification_dict
+
+async def save_notifications(notification_dicts):
+    """Store built notifications in a single write, then push them to connected users"""
+    # A background task replayed after a crash may have stored some already
+    stored = {
+        n.get("id") for n in
+        get_collection("notifications.json").find_in("id", [n["id"] for n in notification_dicts])
+    }
+    notification_dicts = [n for n in notification_dicts if n["id"] not in stored]
+    if not notification_dicts:
+        return []
+    
+    if not await insert_records("notifications.json", notification_dicts):
+        raise StorageError("Failed to save notification")
+    
+    await asyncio.gather(*[
+        manager.send_personal_message(
+            dumps({
                 "type": "notification",
                 "data": notification_dict
             }),
-            notification.user_email
+            notification_dict["user_email"]
         )
-        
+        for notification_dict in notification_dicts
+    ])
+    return notification_dicts
+
+async def queue_notifications(notifications: List[Notification]):
+    """Have the background queue store and push notifications after the response"""
+    await task_queue.enqueue("notifications", {
+        "notifications": [build_notification(n) for n in notifications]
+    })
+
+async def deliver_notifications(payload):
+    await save_notifications(payload["notifications"])
+
+task_queue.register("notifications", deliver_notifications)
+
+@app.post("/notifications")
+async def create_notification(notification: Notification):
+    """Create a new notification"""
+    try:
+        notification_dict = (await save_notifications([build_notification(notification)]))[0]
         return {"message": "Notification created", "notification": notification_dict}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/notifications/{user_email}")
-async def get_user_notifications(user_email: str, unread_only: bool = False):
-    """Get notifications for a user"""
+async def get_user_notifications(user_email: str, request: Request, unread_only: bool = False,
+                                 limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Get notifications for a user, newest first; pass limit/cursor to page through them"""
     try:
-        notifications = read_json_file("notifications.json")
-        user_notifications = [
-            n for n in notifications 
-            if n.get("user_email") == user_email
-        ]
+        tag = etag(("notifications.json", "user_email", user_email))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        if limit is not None or cursor is not None:
+            user_notifications, next_cursor = read_page(
+                "notifications.json", "user_email", user_email, "created_at", limit, cursor,
+                keep=(lambda n: not n.get("read")) if unread_only else None
+            )
+            return tagged({"notifications": user_notifications, "next_cursor": next_cursor}, tag)
+        
+        user_notifications = get_collection("notifications.json").find("user_email", user_email)
         
         if unread_only:
             user_notifications = [n for n in user_notifications if not n.get("read")]
         
         user_notifications.sort(key=lambda x: x.get("created_at", ""), reverse=True)
         
-        return {"notifications": user_notifications}
+        return tagged({"notifications": user_notifications}, tag)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -314,15 +398,10 @@ async def get_user_notifications(user_email: str, unread_only: bool = False):
 async def mark_notification_read(notification_id: str):
     """Mark a notification as read"""
     try:
-        notifications = read_json_file("notifications.json")
-        
-        for notification in notifications:
-            if notification.get("id") == notification_id:
-                notification["read"] = True
-                notification["read_at"] = datetime.now().isoformat()
-                break
-        
-        write_json_file("notifications.json", notifications)
+        await update_record("notifications.json", notification_id, {
+            "read": True,
+            "read_at": datetime.now().isoformat()
+        })
         return {"message": "Notification marked as read"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -331,34 +410,50 @@ async def mark_notification_read(notification_id: str):
 async def mark_all_notifications_read(user_email: str):
     """Mark all notifications as read for a user"""
     try:
-        notifications = read_json_file("notifications.json")
+        notifications = get_collection("notifications.json").find("user_email", user_email)
+        read_at = datetime.now().isoformat()
         
-        for notification in notifications:
-            if notification.get("user_email") == user_email:
-                notification["read"] = True
-                notification["read_at"] = datetime.now().isoformat()
+        notification_ids = [n["id"] for n in notifications if "id" in n]
         
-        write_json_file("notifications.json", notifications)
+        await update_records("notifications.json", [
+            (notification_id, {"read": True, "read_at": read_at})
+            for notification_id in notification_ids
+        ])
         return {"message": "All notifications marked as read"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/notifications/{user_email}/unread-count")
-async def get_unread_notification_count(user_email: str):
+async def get_unread_notification_count(user_email: str, request: Request):
     """Get count of unread notifications"""
     try:
-        notifications = read_json_file("notifications.json")
-        unread_count = len([
-            n for n in notifications 
-            if n.get("user_email") == user_email and not n.get("read")
-        ])
-        return {"unread_count": unread_count}
+        tag = etag(("notifications.json", "user_email", user_email))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        # Kept per user by the storage layer (TALLIES), with every worker's
+        # writes included
+        unread = get_collection("notifications.json").tally("unread", user_email)
+        return tagged({"unread_count": unread}, tag)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # ------------------------
 # AI INTERVIEW ENDPOINT
 # ------------------------
+async def interview_session_for(question: InterviewQuestion):
+    """The server-side session the request names by application or session id, if any"""
+    if question.session_id:
+        session = get_session_by_id(question.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Interview session not found")
+        return session
+    if not question.application_id:
+        return None
+    if get_collection("applications.json").get(question.application_id) is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return await load_session(question.application_id, question.job_role)
+
 @app.post("/interview")
 async def interview(question: InterviewQuestion):
     """Get AI interview question"""
@@ -366,14 +461,69 @@ async def interview(question: InterviewQuestion):
         if not question.job_role:
             raise HTTPException(status_code=400, detail="Job role is required")
         
-        ai_question = ask_ai_question(question.job_role, question.answer)
+        session = await interview_session_for(question)
+        context = history_context(session, question.answer) if session else None
+        asked = asked_questions(session) if session else frozenset()
+        
+        ai_question = await ask_ai_question(
+            question.job_role, question.answer, context=context, asked=asked
+        )
+        
+        if session:
+            await record_turn(session, question.answer, ai_question)
         
         return {"question": ai_question}
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Interview error: {str(e)}")
         raise HTTPException(status_code=500, detail="AI service error")
 
+@app.post("/interview/stream")
+async def interview_stream(question: InterviewQuestion):
+    """Stream an AI interview question as server-sent events"""
+    if not question.job_role:
+        raise HTTPException(status_code=400, detail="Job role is required")
+    
+    session = await interview_session_for(question)
+    context = history_context(session, question.answer) if session else None
+    asked = asked_questions(session) if session else frozenset()
+    
+    async def events():
+        async for event, data in stream_ai_question(
+            question.job_role, question.answer, context=context, asked=asked
+        ):
+            if event == "done" and session:
+                await record_turn(session, question.answer, data["question"])
+            yield f"event: {event}\ndata: {dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the tokens
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/interview/session")
+async def start_practice_session(practice: PracticeSession):
+    """Start a server-side history for an interview not tied to an application"""
+    if not practice.job_role:
+        raise HTTPException(status_code=400, detail="Job role is required")
+    try:
+        return await start_session(practice.job_role)
+    except Exception as e:
+        print(f"Start interview session error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to start interview session")
+
+@app.get("/interview/session/{application_id}")
+async def get_interview_session(application_id: str):
+    """Get the server-side question/answer history of an AI interview"""
+    session = get_session(application_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+    return session
+
 # ------------------------
 # INTERVIEW SYSTEM ENDPOINTS
 # ------------------------
@@ -382,43 +532,35 @@ async def save_interview_results(interview_data: InterviewCreate):
     """Save interview results"""
     try:
         # Check if application exists
-        applications = read_json_file("applications.json")
-        application = None
-        for app in applications:
-            if app.get("id") == interview_data.application_id:
-                application = app
-                break
+        application = get_collection("applications.json").get(interview_data.application_id)
         
         if not application:
             raise HTTPException(status_code=404, detail="Application not found")
         
-        # Read existing interviews
-        interviews = read_json_file("interviews.json")
+        # Score the answers here rather than trusting the client's numbers
+        result = score_answers(interview_data.answers)
+        feedback = result.pop("feedback")
         
         # Create new interview record
         interview_dict = interview_data.dict()
+        interview_dict.update(result)
         interview_dict["id"] = get_next_id("interviews.json")
         interview_dict["completed_at"] = datetime.now().isoformat()
         
-        interviews.append(interview_dict)
-        
         # Save interviews
-        write_json_file("interviews.json", interviews)
+        if not await insert_record("interviews.json", interview_dict):
+            raise HTTPException(status_code=500, detail="Failed to save interview results")
         
         # Update application status and score
-        for app in applications:
-            if app.get("id") == interview_data.application_id:
-                app["status"] = "interview_completed"
-                app["interview_score"] = interview_data.percentage
-                app["status_updated_at"] = datetime.now().isoformat()
-                app["status_updated_by"] = "system"
-                break
-        
-        write_json_file("applications.json", applications)
+        await update_record("applications.json", interview_data.application_id, {
+            "status": "interview_completed",
+            "interview_score": interview_dict["percentage"],
+            "status_updated_at": datetime.now().isoformat(),
+            "status_updated_by": "system"
+        })
         
         # Notify company about interview completion
-        jobs = read_json_file("jobs.json")
-        job = next((j for j in jobs if j.get("id") == interview_data.job_id), {})
+        job = get_collection("jobs.json").get(interview_data.job_id) or {}
         
         notification = Notification(
             user_email=job.get("company_email", ""),
@@ -429,94 +571,139 @@ async def save_interview_results(interview_data: InterviewCreate):
                 "application_id": interview_data.application_id,
                 "candidate_email": interview_data.candidate_email,
                 "job_id": interview_data.job_id,
-                "score": interview_data.percentage,
-                "performance": interview_data.performance
+                "score": interview_dict["percentage"],
+                "performance": interview_dict["performance"]
             }
         )
-        await create_notification(notification)
         
         # Also notify candidate
         candidate_notification = Notification(
             user_email=interview_data.candidate_email,
             user_type="candidate",
-            message=f"Your interview for {job.get('title', 'job')} has been completed. Score: {interview_data.percentage}%",
+            message=f"Your interview for {job.get('title', 'job')} has been completed. Score: {interview_dict['percentage']}%",
             type="info",
             data={
                 "application_id": interview_data.application_id,
                 "job_id": interview_data.job_id,
-                "score": interview_data.percentage,
-                "performance": interview_data.performance
+                "score": interview_dict["percentage"],
+                "performance": interview_dict["performance"]
             }
         )
-        await create_notification(candidate_notification)
+        await queue_notifications([notification, candidate_notification])
         
         return {
             "success": True,
             "message": "Interview results saved successfully",
-            "interview": interview_dict
+            "interview": interview_dict,
+            "feedback": feedback
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Save interview error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to save interview results")
 
+@app.post("/interviews/rescore")
+async def rescore_all_interviews(force: bool = False):
+    """Re-score stored interviews after the scoring rubric changed"""
+    try:
+        interview_updates, application_updates = rescore_interviews(force)
+        if interview_updates:
+            await update_records("interviews.json", interview_updates)
+        if application_updates:
+            await update_records("applications.json", application_updates)
+        
+        return {
+            "success": True,
+            "rescored": len(interview_updates),
+            "applications_updated": len(application_updates)
+        }
+        
+    except Exception as e:
+        print(f"Rescore interviews error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to rescore interviews")
+
 @app.get("/interviews/application/{application_id}")
-async def get_interviews_by_application(application_id: str):
-    """Get interviews for a specific application"""
+async def get_interviews_by_application(application_id: str, request: Request, fields: Optional[str] = None):
+    """Get interviews for a specific application; fields=score,percentage,... trims each interview"""
     try:
-        interviews = read_json_file("interviews.json")
-        application_interviews = [
-            interview for interview in interviews 
-            if interview.get("application_id") == application_id
-        ]
+        tag = etag(("interviews.json", "application_id", application_id))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        projection = field_projection(fields)
+        application_interviews = get_collection("interviews.json").find("application_id", application_id)
         
         # Sort by completion date
         application_interviews.sort(key=lambda x: x.get("completed_at", ""), reverse=True)
         
-        return {"interviews": application_interviews}
+        return tagged({"interviews": project(application_interviews, projection)}, tag)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Get interviews error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch interviews")
 
 @app.get("/interviews/candidate/{candidate_email}")
-async def get_interviews_by_candidate(candidate_email: str):
-    """Get all interviews for a candidate"""
+async def get_interviews_by_candidate(candidate_email: str, request: Request, fields: Optional[str] = None):
+    """Get all interviews for a candidate; fields=score,percentage,... trims each interview"""
     try:
-        interviews = read_json_file("interviews.json")
-        candidate_interviews = [
-            interview for interview in interviews 
-            if interview.get("candidate_email") == candidate_email
-        ]
+        tag = etag(("interviews.json", "candidate_email", candidate_email), ("jobs.json",))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        projection = field_projection(fields)
+        candidate_interviews = get_collection("interviews.json").find("candidate_email", candidate_email)
         
         # Get job details for each interview
-        jobs = read_json_file("jobs.json")
-        for interview in candidate_interviews:
-            job = next((j for j in jobs if j.get("id") == interview.get("job_id")), {})
-            interview["job_title"] = job.get("title", "")
-            interview["company_email"] = job.get("company_email", "")
+        if wants(projection, "job_title") or wants(projection, "company_email"):
+            jobs = records_by(
+                get_collection("jobs.json").find_in("id", [i.get("job_id") for i in candidate_interviews]),
+                "id"
+            )
+            for interview in candidate_interviews:
+                job = jobs.get(interview.get("job_id"), {})
+                interview["job_title"] = job.get("title", "")
+                interview["company_email"] = job.get("company_email", "")
         
         # Sort by completion date
         candidate_interviews.sort(key=lambda x: x.get("completed_at", ""), reverse=True)
         
-        return {"interviews": candidate_interviews}
+        return tagged({"interviews": project(candidate_interviews, projection)}, tag)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Get candidate interviews error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch interviews")
 
 @app.get("/interviews/job/{job_id}")
-async def get_interviews_by_job(job_id: str):
-    """Get all interviews for a job"""
+async def get_interviews_by_job(job_id: str, request: Request, fields: Optional[str] = None,
+                                limit: Optional[int] = None, cursor: Optional[str] = None):
+    """
+    Get all interviews for a job, best score first; pass limit/cursor to
+    page through them and fields=score,percentage,... to trim each interview
+    """
     try:
-        interviews = read_json_file("interviews.json")
-        job_interviews = [
-            interview for interview in interviews 
-            if interview.get("job_id") == job_id
-        ]
+        tag = etag(("interviews.json", "job_id", job_id))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        projection = field_projection(fields)
+        if limit is not None or cursor is not None:
+            job_interviews, next_cursor = read_page(
+                "interviews.json", "job_id", job_id, "percentage", limit, cursor
+            )
+            return tagged({"interviews": project(job_interviews, projection), "next_cursor": next_cursor}, tag)
+        
+        job_interviews = get_collection("interviews.json").find("job_id", job_id)
         
         # Sort by score
         job_interviews.sort(key=lambda x: x.get("percentage", 0), reverse=True)
         
-        return {"interviews": job_interviews}
+        return tagged({"interviews": project(job_interviews, projection)}, tag)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Get job interviews error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch interviews")
@@ -528,43 +715,45 @@ async def get_interviews_by_job(job_id: str):
 async def create_job(job: Job):
     """Create new job posting with notifications"""
     try:
-        companies = read_json_file("company.json")
-        company_exists = any(c.get("email") == job.company_email for c in companies)
+        company_exists = get_collection("company.json").find_one("email", job.company_email)
         if not company_exists:
             raise HTTPException(status_code=400, detail="Company not found")
         
-        jobs = read_json_file("jobs.json")
-        
         job_dict = job.dict()
         job_dict["id"] = get_next_id("jobs.json")
         job_dict["created_date"] = datetime.now().isoformat()
         job_dict["status"] = "open"
         job_dict["company_name"] = job.company_email.split('@')[0]
         
-        jobs.append(job_dict)
-        
-        if write_json_file("jobs.json", jobs):
+        if await insert_record("jobs.json", job_dict):
+            job_index.add(job_dict)
+            job_search_index.add(job_dict)
+            
+            # Have opening questions ready before candidates start interviewing
+            question_pool.refill(job.title)
+            
             # Notify matched candidates
-            profiles = read_json_file("profiles.json")
-            for profile in profiles:
-                candidate_skills = set([s.lower() for s in profile.get("skills", [])])
-                job_skills = set([s.lower() for s in job.tags + 
-                                 " ".join(job.requirements).lower().split()])
-                
-                if candidate_skills.intersection(job_skills):
-                    notification = Notification(
-                        user_email=profile.get("email"),
-                        user_type="candidate",
-                        message=f"New job matches your skills: {job.title}",
-                        type="info",
-                        data={
-                            "job_id": job_dict["id"],
-                            "job_title": job.title,
-                            "company": job.company_email,
-                            "match_reason": "Your skills match this job"
-                        }
-                    )
-                    await create_notification(notification)
+            job_skills = set([s.lower() for s in job.tags + 
+                             " ".join(job.requirements).lower().split()])
+            skill_index.sync(get_collection("profiles.json"))
+            
+            notifications = [
+                Notification(
+                    user_email=email,
+                    user_type="candidate",
+                    message=f"New job matches your skills: {job.title}",
+                    type="info",
+                    data={
+                        "job_id": job_dict["id"],
+                        "job_title": job.title,
+                        "company": job.company_email,
+                        "match_reason": "Your skills match this job"
+                    }
+                )
+                for email in skill_index.match(job_skills)
+            ]
+            if notifications:
+                await queue_notifications(notifications)
             
             return {
                 "message": "Job created successfully",
@@ -581,23 +770,89 @@ async def create_job(job: Job):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/jobs")
-async def get_all_jobs():
-    """Get all jobs"""
+async def get_all_jobs(request: Request, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Get all jobs; pass limit/cursor to page through them"""
     try:
+        tag = etag(("jobs.json",))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        if limit is not None or cursor is not None:
+            jobs, next_cursor = read_page("jobs.json", None, None, None, limit, cursor)
+            return tagged({"jobs": jobs, "next_cursor": next_cursor}, tag)
+        
         jobs = read_json_file("jobs.json")
-        return {"jobs": jobs}
+        return tagged({"jobs": jobs}, tag)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Get jobs error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/jobs/search")
+async def search_jobs(
+    request: Request,
+    q: Optional[str] = None,
+    location: Optional[str] = None,
+    tags: Optional[str] = None,
+    experience_level: Optional[str] = None,
+    status: Optional[str] = None,
+    company: Optional[str] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """
+    Search jobs by words in their text (q) and location, filtered by
+    comma-separated tags, experience level, status and company email.
+    Sorted by relevance when there is a query, newest first otherwise.
+    Returns one page of job summaries with the total and next_cursor.
+    """
+    try:
+        tag = etag(("jobs.json",))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        limit = DEFAULT_PAGE_SIZE if limit is None else limit
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        
+        filters = {}
+        if tags:
+            filters["tags"] = [t.strip() for t in tags.split(",") if t.strip()]
+        for name, value in (("experience_level", experience_level), ("status", status), ("company", company)):
+            if value:
+                filters[name] = value
+        
+        jobs_collection = get_collection("jobs.json")
+        job_search_index.sync(jobs_collection)
+        try:
+            after = decode_cursor(cursor) if cursor else None
+            job_ids, total, next_key = job_search_index.search(
+                q or "", location or "", filters, sort, limit, after
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        jobs = [job_summary(job) for job in (jobs_collection.get(job_id) for job_id in job_ids) if job]
+        return tagged({"jobs": jobs, "total": total, "next_cursor": encode_cursor(next_key)}, tag)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Search jobs error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/jobs/{job_id}")
-async def get_job(job_id: str):
+async def get_job(job_id: str, request: Request):
     """Get specific job by ID"""
     try:
-        jobs = read_json_file("jobs.json")
-        for job in jobs:
-            if job.get("id") == job_id:
-                return {"job": job}
+        tag = etag(("jobs.json",))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        job = get_collection("jobs.json").get(job_id)
+        if job:
+            return tagged({"job": job}, tag)
         raise HTTPException(status_code=404, detail="Job not found")
     except HTTPException:
         raise
@@ -606,12 +861,15 @@ async def get_job(job_id: str):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/jobs/company/{email}")
-async def get_company_jobs(email: str):
+async def get_company_jobs(email: str, request: Request):
     """Get all jobs by company"""
     try:
-        jobs = read_json_file("jobs.json")
-        company_jobs = [job for job in jobs if job.get("company_email") == email]
-        return {"jobs": company_jobs}
+        tag = etag(("jobs.json", "company_email", email))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        company_jobs = get_collection("jobs.json").find("company_email", email)
+        return tagged({"jobs": company_jobs}, tag)
     except Exception as e:
         print(f"Get company jobs error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -620,23 +878,13 @@ async def get_company_jobs(email: str):
 async def delete_job(job_id: str):
     """Delete job"""
     try:
-        jobs = read_json_file("jobs.json")
-        
-        job_index = -1
-        for i, job in enumerate(jobs):
-            if job.get("id") == job_id:
-                job_index = i
-                break
-        
-        if job_index == -1:
+        deleted_job = get_collection("jobs.json").get(job_id)
+        if not deleted_job or not await delete_record("jobs.json", job_id):
             raise HTTPException(status_code=404, detail="Job not found")
         
-        deleted_job = jobs.pop(job_index)
-        
-        if write_json_file("jobs.json", jobs):
-            return {"message": "Job deleted successfully", "job": deleted_job}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to delete job")
+        job_index.remove(job_id)
+        job_search_index.remove(job_id)
+        return {"message": "Job deleted successfully", "job": deleted_job}
             
     except HTTPException:
         raise
@@ -651,35 +899,34 @@ async def delete_job(job_id: str):
 async def apply_job(application: Application):
     """Apply for a job with notification"""
     try:
-        candidates = read_json_file("candidate.json")
-        candidate_exists = any(c.get("email") == application.candidate_email for c in candidates)
+        candidate_exists = get_collection("candidate.json").find_one("email", application.candidate_email)
         if not candidate_exists:
             raise HTTPException(status_code=400, detail="Candidate not found")
         
-        jobs = read_json_file("jobs.json")
-        job_exists = any(j.get("id") == application.job_id for j in jobs)
-        if not job_exists:
+        job = get_collection("jobs.json").get(application.job_id)
+        if not job:
             raise HTTPException(status_code=400, detail="Job not found")
         
-        applications = read_json_file("applications.json")
-        existing_application = next(
-            (app for app in applications 
-             if app.get("job_id") == application.job_id and 
-                app.get("candidate_email") == application.candidate_email),
-            None
-        )
-        if existing_application:
-            raise HTTPException(status_code=400, detail="Already applied for this job")
-        
-        job = next((j for j in jobs if j.get("id") == application.job_id), {})
-        
-        app_dict = application.dict()
-        app_dict["id"] = get_next_id("applications.json")
-        app_dict["applied_date"] = datetime.now().isoformat()
-        
-        applications.append(app_dict)
+        applications = get_collection("applications.json")
+        async with applications.lock:
+            existing_application = next(
+                (app for app in applications.find("candidate_email", application.candidate_email)
+                 if app.get("job_id") == application.job_id),
+                None
+            )
+            if existing_application:
+                raise HTTPException(status_code=400, detail="Already applied for this job")
+            
+            app_dict = application.dict()
+            app_dict["id"] = get_next_id("applications.json")
+            app_dict["applied_date"] = datetime.now().isoformat()
+            
+            try:
+                saved = await insert_record("applications.json", app_dict)
+            except DuplicateError:
+                raise HTTPException(status_code=400, detail="Already applied for this job")
         
-        if write_json_file("applications.json", applications):
+        if saved:
             # Notify company
             notification = Notification(
                 user_email=job.get("company_email"),
@@ -693,7 +940,7 @@ async def apply_job(application: Application):
                     "candidate_email": application.candidate_email
                 }
             )
-            await create_notification(notification)
+            await queue_notifications([notification])
             
             return {"message": "Application submitted successfully"}
         else:
@@ -706,117 +953,191 @@ async def apply_job(application: Application):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/applications/candidate/{email}")
-async def get_candidate_applications(email: str):
-    """Get all applications by candidate"""
+async def get_candidate_applications(email: str, request: Request, fields: Optional[str] = None):
+    """
+    Get all applications by candidate; fields=id,status,job_details.title,...
+    trims each application and skips the joins it leaves out
+    """
     try:
-        applications = read_json_file("applications.json")
-        candidate_apps = [app for app in applications if app.get("candidate_email") == email]
+        tag = etag(
+            ("applications.json", "candidate_email", email), ("jobs.json",),
+            ("interviews.json", "candidate_email", email)
+        )
+        if not_modified(request, tag):
+            return not_modified_response(tag)
         
-        jobs = read_json_file("jobs.json")
-        for app in candidate_apps:
-            job = next((j for j in jobs if j.get("id") == app.get("job_id")), {})
-            app["job_details"] = job
+        projection = field_projection(fields)
+        candidate_apps = get_collection("applications.json").find("candidate_email", email)
+        
+        if wants(projection, "job_details"):
+            jobs = records_by(
+                get_collection("jobs.json").find_in("id", [app.get("job_id") for app in candidate_apps]),
+                "id"
+            )
+            for app in candidate_apps:
+                app["job_details"] = jobs.get(app.get("job_id"), {})
         
         # Get interview scores for each application
-        interviews = read_json_file("interviews.json")
-        for app in candidate_apps:
-            app_interviews = [i for i in interviews if i.get("application_id") == app.get("id")]
-            if app_interviews:
-                latest_interview = sorted(app_interviews, key=lambda x: x.get("completed_at", ""), reverse=True)[0]
-                app["latest_interview"] = {
-                    "score": latest_interview.get("score"),
-                    "max_score": latest_interview.get("max_score"),
-                    "percentage": latest_interview.get("percentage"),
-                    "performance": latest_interview.get("performance"),
-                    "completed_at": latest_interview.get("completed_at")
-                }
+        if wants(projection, "latest_interview"):
+            latest_interviews = latest_interview_summaries([app.get("id") for app in candidate_apps])
+            for app in candidate_apps:
+                if app.get("id") in latest_interviews:
+                    app["latest_interview"] = latest_interviews[app.get("id")]
         
-        return {"applications": candidate_apps}
+        return tagged({"applications": project(candidate_apps, projection)}, tag)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Get candidate applications error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/applications/job/{job_id}")
-async def get_job_applications(job_id: str):
-    """Get all applications for a job"""
+async def get_job_applications(job_id: str, request: Request, fields: Optional[str] = None,
+                               limit: Optional[int] = None, cursor: Optional[str] = None):
+    """
+    Get all applications for a job; pass limit/cursor to page through them
+    and fields=id,status,candidate_profile.name,... to trim each application
+    and skip the joins it leaves out
+    """
     try:
-        applications = read_json_file("applications.json")
-        job_apps = [app for app in applications if app.get("job_id") == job_id]
+        tag = etag(
+            ("applications.json", "job_id", job_id), ("profiles.json",),
+            ("interviews.json", "job_id", job_id)
+        )
+        if not_modified(request, tag):
+            return not_modified_response(tag)
         
-        profiles = read_json_file("profiles.json")
-        for app in job_apps:
-            profile = next((p for p in profiles if p.get("email") == app.get("candidate_email")), {})
-            app["candidate_profile"] = profile
+        projection = field_projection(fields)
+        next_cursor = None
+        if limit is not None or cursor is not None:
+            job_apps, next_cursor = read_page("applications.json", "job_id", job_id, None, limit, cursor)
+        else:
+            job_apps = get_collection("applications.json").find("job_id", job_id)
         
-        # Get interview scores for each application
-        interviews = read_json_file("interviews.json")
-        for app in job_apps:
-            app_interviews = [i for i in interviews if i.get("application_id") == app.get("id")]
-            if app_interviews:
-                latest_interview = sorted(app_interviews, key=lambda x: x.get("completed_at", ""), reverse=True)[0]
-                app["latest_interview"] = {
-                    "score": latest_interview.get("score"),
-                    "max_score": latest_interview.get("max_score"),
-                    "percentage": latest_interview.get("percentage"),
-                    "performance": latest_interview.get("performance"),
-                    "completed_at": latest_interview.get("completed_at")
-                }
+        if wants(projection, "candidate_profile"):
+            profiles = records_by(
+                get_collection("profiles.json").find_in("email", [app.get("candidate_email") for app in job_apps]),
+                "email"
+            )
+            for app in job_apps:
+                app["candidate_profile"] = profiles.get(app.get("candidate_email"), {})
         
-        return {"applications": job_apps}
+        # Get interview scores for each application
+        if wants(projection, "latest_interview"):
+            latest_interviews = latest_interview_summaries([app.get("id") for app in job_apps])
+            for app in job_apps:
+                if app.get("id") in latest_interviews:
+                    app["latest_interview"] = latest_interviews[app.get("id")]
+        
+        job_apps = project(job_apps, projection)
+        if limit is not None or cursor is not None:
+            return tagged({"applications": job_apps, "next_cursor": next_cursor}, tag)
+        return tagged({"applications": job_apps}, tag)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Get job applications error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def status_notification(application, job, old_status, status_update: StatusUpdate):
+    """Notification telling a candidate their application's status changed"""
+    notification_message = f"Your application for {job.get('title', 'a job')} status updated to '{status_update.status}'"
+    if status_update.message:
+        notification_message += f": {status_update.message}"
+    
+    return Notification(
+        user_email=application.get("candidate_email"),
+        user_type="candidate",
+        message=notification_message,
+        type="info",
+        data={
+            "application_id": application.get("id"),
+            "job_id": application.get("job_id"),
+            "job_title": job.get("title", "Unknown Job"),
+            "old_status": old_status,
+            "new_status": status_update.status,
+            "company": status_update.updated_by
+        }
+    )
+
+def status_changes(status_update: StatusUpdate):
+    return {
+        "status": status_update.status,
+        "status_updated_at": datetime.now().isoformat(),
+        "status_updated_by": status_update.updated_by,
+        "status_message": status_update.message
+    }
+
+@app.put("/applications/status")
+async def bulk_update_application_status(bulk: BulkStatusUpdate):
+    """
+    Apply many status updates in one write and notify the candidates in
+    one batch. Applications that don't exist are skipped and listed in
+    not_found; when one is listed twice the last update wins.
+    """
+    try:
+        if len(bulk.updates) > BULK_UPDATE_LIMIT:
+            raise HTTPException(status_code=400, detail=f"At most {BULK_UPDATE_LIMIT} updates per request")
+        
+        requested = {update.application_id: update for update in bulk.updates}
+        applications = get_collection("applications.json").find_in("id", list(requested))
+        found = {application.get("id") for application in applications}
+        not_found = [app_id for app_id in requested if app_id not in found]
+        
+        old_statuses = {}
+        updates = []
+        for application in applications:
+            app_id = application.get("id")
+            old_statuses[app_id] = application.get("status", "applied")
+            changes = status_changes(requested[app_id])
+            application.update(changes)
+            updates.append((app_id, changes))
+        
+        if updates:
+            await update_records("applications.json", updates)
+            
+            jobs = records_by(
+                get_collection("jobs.json").find_in("id", [app.get("job_id") for app in applications]),
+                "id"
+            )
+            await queue_notifications([
+                status_notification(
+                    application, jobs.get(application.get("job_id"), {}),
+                    old_statuses[application.get("id")], requested[application.get("id")]
+                )
+                for application in applications
+            ])
+        
+        return {
+            "message": "Application statuses updated",
+            "updated": len(updates),
+            "applications": applications,
+            "not_found": not_found
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.put("/applications/{app_id}/status")
 async def update_application_status(app_id: str, status_update: StatusUpdate):
     """Update application status and notify candidate"""
     try:
-        applications = read_json_file("applications.json")
-        
-        application = None
-        for app in applications:
-            if app.get("id") == app_id:
-                application = app
-                break
+        application = get_collection("applications.json").get(app_id)
         
         if not application:
             raise HTTPException(status_code=404, detail="Application not found")
         
         old_status = application.get("status", "applied")
-        application["status"] = status_update.status
-        application["status_updated_at"] = datetime.now().isoformat()
-        application["status_updated_by"] = status_update.updated_by
-        application["status_message"] = status_update.message
+        changes = status_changes(status_update)
+        application.update(changes)
         
-        write_json_file("applications.json", applications)
+        await update_record("applications.json", app_id, changes)
         
-        job = None
-        jobs = read_json_file("jobs.json")
-        for j in jobs:
-            if j.get("id") == application.get("job_id"):
-                job = j
-                break
-        
-        notification_message = f"Your application for {job.get('title', 'a job')} status updated to '{status_update.status}'"
-        if status_update.message:
-            notification_message += f": {status_update.message}"
-        
-        notification = Notification(
-            user_email=application.get("candidate_email"),
-            user_type="candidate",
-            message=notification_message,
-            type="info",
-            data={
-                "application_id": app_id,
-                "job_id": application.get("job_id"),
-                "job_title": job.get("title", "Unknown Job"),
-                "old_status": old_status,
-                "new_status": status_update.status,
-                "company": status_update.updated_by
-            }
-        )
+        job = get_collection("jobs.json").get(application.get("job_id")) or {}
         
-        await create_notification(notification)
+        await queue_notifications([status_notification(application, job, old_status, status_update)])
         
         return {
             "message": "Application status updated",
@@ -835,24 +1156,22 @@ async def update_application_status(app_id: str, status_update: StatusUpdate):
 async def save_profile(profile: Profile):
     """Save or update candidate profile"""
     try:
-        profiles = read_json_file("profiles.json")
-        
-        profile_index = -1
-        for i, p in enumerate(profiles):
-            if p.get("email") == profile.email:
-                profile_index = i
-                break
-        
-        profile_dict = profile.dict()
-        profile_dict["updated_at"] = datetime.now().isoformat()
-        
-        if profile_index != -1:
-            profiles[profile_index] = profile_dict
-        else:
-            profile_dict["created_at"] = datetime.now().isoformat()
-            profiles.append(profile_dict)
-        
-        if write_json_file("profiles.json", profiles):
+        collection = get_collection("profiles.json")
+        async with collection.lock:
+            profile_dict = profile.dict()
+            profile_dict["updated_at"] = datetime.now().isoformat()
+            
+            # Only this profile is written, so profiles other workers save
+            # at the same time are kept
+            collection.upsert("email", profile_dict, defaults={
+                "id": collection.next_id(),
+                "created_at": profile_dict["updated_at"]
+            })
+            if skill_index.in_sync(collection):
+                skill_index.add(profile_dict)
+            saved = await collection.commit()
+        
+        if saved:
             return {"message": "Profile saved successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to save profile")
@@ -865,13 +1184,10 @@ async def save_profile(profile: Profile):
 async def get_profile(email: str):
     """Get candidate profile"""
     try:
-        profiles = read_json_file("profiles.json")
-        
-        profile = next((p for p in profiles if p.get("email") == email), None)
+        profile = get_collection("profiles.json").find_one("email", email)
         
         if not profile:
-            candidates = read_json_file("candidate.json")
-            candidate = next((c for c in candidates if c.get("email") == email), {})
+            candidate = get_collection("candidate.json").find_one("email", email) or {}
             profile = {
                 "email": email,
                 "name": candidate.get("name", email.split('@')[0]),
@@ -896,19 +1212,21 @@ async def get_candidate_profile_for_company(candidate_email: str, company_email:
         profile_response = await get_profile(candidate_email)
         profile = profile_response.get("profile", {})
         
-        applications = read_json_file("applications.json")
-        jobs = read_json_file("jobs.json")
+        applications = get_collection("applications.json").find("candidate_email", candidate_email)
+        jobs = records_by(
+            get_collection("jobs.json").find_in("id", [app.get("job_id") for app in applications]),
+            "id"
+        )
         
         company_applications = []
         for app in applications:
-            if app.get("candidate_email") == candidate_email:
-                job = next((j for j in jobs if j.get("id") == app.get("job_id")), {})
-                if job.get("company_email") == company_email:
-                    company_applications.append({
-                        **app,
-                        "job_title": job.get("title"),
-                        "job_location": job.get("location")
-                    })
+            job = jobs.get(app.get("job_id"), {})
+            if job.get("company_email") == company_email:
+                company_applications.append({
+                    **app,
+                    "job_title": job.get("title"),
+                    "job_location": job.get("location")
+                })
         
         skills = profile.get("skills", [])
         skills_analysis = {
@@ -950,31 +1268,22 @@ async def get_matched_jobs(email: str):
         
         candidate_skills = set([skill.lower() for skill in profile.get("skills", [])])
         
-        jobs = read_json_file("jobs.json")
-        open_jobs = [job for job in jobs if job.get("status") == "open"]
-        
-        matched_jobs = []
-        
-        for job in open_jobs:
-            job_text = f"{job.get('title', '')} {job.get('description', '')} {' '.join(job.get('requirements', []))} {' '.join(job.get('tags', []))}"
-            job_keywords = set([word.lower() for word in job_text.split() if len(word) > 3])
-            
-            common_skills = candidate_skills.intersection(job_keywords)
-            if job_keywords:
-                match_score = (len(common_skills) / len(job_keywords)) * 100
-            else:
-                match_score = 0
-            
-            if match_score > 0:
-                matched_jobs.append({
-                    **job,
-                    "match_score": round(match_score, 1),
-                    "matching_skills": list(common_skills)
-                })
+        jobs_collection = get_collection("jobs.json")
+        job_index.sync(jobs_collection)
+        top = job_index.search(candidate_skills, k=20)
+        jobs = {job["id"]: job for job in jobs_collection.find_in("id", [job_id for job_id, _, _ in top])}
         
-        matched_jobs.sort(key=lambda x: x["match_score"], reverse=True)
+        matched_jobs = [
+            {
+                **jobs[job_id],
+                "match_score": round(score, 2),
+                "matching_skills": matching_skills
+            }
+            for job_id, score, matching_skills in top
+            if job_id in jobs
+        ]
         
-        return {"matched_jobs": matched_jobs[:20]}
+        return {"matched_jobs": matched_jobs}
         
     except Exception as e:
         print(f"Get matched jobs error: {str(e)}")
@@ -984,101 +1293,117 @@ async def get_matched_jobs(email: str):
 # ANALYTICS ENDPOINTS
 # ------------------------
 @app.get("/analytics/candidate/{email}")
-async def get_candidate_analytics(email: str):
+async def get_candidate_analytics(email: str, request: Request):
     """Get candidate analytics"""
     try:
-        applications = read_json_file("applications.json")
-        candidate_apps = [app for app in applications if app.get("candidate_email") == email]
-        
-        # Get interview count
-        interviews = read_json_file("interviews.json")
-        interview_count = len([i for i in interviews if i.get("candidate_email") == email])
-        
-        stats = {
-            "total_applications": len(candidate_apps),
-            "applied": len([app for app in candidate_apps if app.get("status") == "applied"]),
-            "reviewed": len([app for app in candidate_apps if app.get("status") == "reviewed"]),
-            "interview_scheduled": len([app for app in candidate_apps if app.get("status") == "interview_scheduled"]),
-            "interview_completed": len([app for app in candidate_apps if app.get("status") == "interview_completed"]),
-            "accepted": len([app for app in candidate_apps if app.get("status") == "accepted"]),
-            "rejected": len([app for app in candidate_apps if app.get("status") == "rejected"]),
-            "interview_count": interview_count
-        }
+        tag = etag(
+            ("applications.json", "candidate_email", email),
+            ("interviews.json", "candidate_email", email)
+        )
+        if not_modified(request, tag):
+            return not_modified_response(tag)
         
-        recent_apps = sorted(
-            candidate_apps,
-            key=lambda x: x.get("applied_date", ""),
-            reverse=True
-        )[:10]
+        stats, recent_apps = analytics.candidate_stats(email)
         
-        return {
+        return tagged({
             "statistics": stats,
             "recent_applications": recent_apps
-        }
+        }, tag)
         
     except Exception as e:
         print(f"Get candidate analytics error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/analytics/company/{email}")
-async def get_company_analytics(email: str):
+async def get_company_analytics(email: str, request: Request):
     """Get company analytics"""
     try:
-        jobs = read_json_file("jobs.json")
-        company_jobs = [job for job in jobs if job.get("company_email") == email]
-        
-        applications = read_json_file("applications.json")
-        
-        # Get interview stats
-        interviews = read_json_file("interviews.json")
-        company_interviews = []
-        for job in company_jobs:
-            job_interviews = [i for i in interviews if i.get("job_id") == job.get("id")]
-            company_interviews.extend(job_interviews)
-        
-        stats = {
-            "total_jobs": len(company_jobs),
-            "open_jobs": len([job for job in company_jobs if job.get("status") == "open"]),
-            "closed_jobs": len([job for job in company_jobs if job.get("status") == "closed"]),
-            "total_applications": 0,
-            "new_applications": 0,
-            "interview_scheduled": 0,
-            "interview_completed": 0,
-            "hired": 0,
-            "total_interviews": len(company_interviews),
-            "avg_interview_score": 0
-        }
+        tag = etag(("jobs.json", "company_email", email), ("applications.json",), ("interviews.json",))
+        if not_modified(request, tag):
+            return not_modified_response(tag)
         
-        company_applications = []
-        for job in company_jobs:
-            job_apps = [app for app in applications if app.get("job_id") == job.get("id")]
-            stats["total_applications"] += len(job_apps)
-            stats["new_applications"] += len([app for app in job_apps if app.get("status") == "applied"])
-            stats["interview_scheduled"] += len([app for app in job_apps if app.get("status") == "interview_scheduled"])
-            stats["interview_completed"] += len([app for app in job_apps if app.get("status") == "interview_completed"])
-            stats["hired"] += len([app for app in job_apps if app.get("status") == "accepted"])
-            company_applications.extend(job_apps)
-        
-        # Calculate average interview score
-        if company_interviews:
-            total_score = sum([i.get("percentage", 0) for i in company_interviews])
-            stats["avg_interview_score"] = round(total_score / len(company_interviews), 1)
-        
-        recent_apps = sorted(
-            company_applications,
-            key=lambda x: x.get("applied_date", ""),
-            reverse=True
-        )[:10]
+        stats, recent_apps = analytics.company_stats(email)
         
-        return {
+        return tagged({
             "statistics": stats,
             "recent_applications": recent_apps
-        }
+        }, tag)
         
     except Exception as e:
         print(f"Get company analytics error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# ------------------------
+# DASHBOARD ENDPOINTS
+# ------------------------
+@app.get("/dashboard/company/{email}")
+async def get_company_dashboard(email: str, request: Request, fields: Optional[str] = None):
+    """
+    Everything the company applications page shows, in one response: the
+    company's jobs, their applications grouped by job id (with candidate
+    profile and latest interview score) and its statistics.
+    fields=id,status,candidate_profile.name,... trims each application and
+    skips the joins it leaves out; the full interview history, answers
+    included, is only added when fields names "interviews".
+    """
+    try:
+        tag = etag(
+            ("jobs.json", "company_email", email), ("applications.json",),
+            ("interviews.json",), ("profiles.json",)
+        )
+        if not_modified(request, tag):
+            return not_modified_response(tag)
+        
+        projection = field_projection(fields)
+        company_jobs = get_collection("jobs.json").find("company_email", email)
+        job_titles = {job.get("id"): job.get("title", "") for job in company_jobs}
+        company_apps = get_collection("applications.json").find_in("job_id", list(job_titles))
+        
+        if wants(projection, "candidate_profile"):
+            profiles = records_by(
+                get_collection("profiles.json").find_in(
+                    "email", list({app.get("candidate_email") for app in company_apps})
+                ),
+                "email"
+            )
+            for app in company_apps:
+                app["candidate_profile"] = profiles.get(app.get("candidate_email"), {})
+        
+        with_history = projection is not None and "interviews" in projection
+        if wants(projection, "latest_interview") or with_history:
+            histories = {}
+            for interview in get_collection("interviews.json").find_in(
+                "application_id", [app.get("id") for app in company_apps]
+            ):
+                interview["job_title"] = job_titles.get(interview.get("job_id"), "")
+                interview["company_email"] = email
+                histories.setdefault(interview.get("application_id"), []).append(interview)
+            for app in company_apps:
+                history = histories.get(app.get("id"), [])
+                # Most recent first, as /interviews/candidate returns them
+                history.sort(key=lambda x: x.get("completed_at", ""), reverse=True)
+                if history:
+                    app["latest_interview"] = interview_summary(history[0])
+                if with_history:
+                    app["interviews"] = history
+        
+        applications_by_job = {job_id: [] for job_id in job_titles}
+        for app in company_apps:
+            applications_by_job[app.get("job_id")].append(project(app, projection))
+        
+        stats, _ = analytics.company_stats(email, list(job_titles), recent=False)
+        
+        return tagged({
+            "statistics": stats,
+            "jobs": company_jobs,
+            "applications": applications_by_job
+        }, tag)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Get company dashboard error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 # ------------------------
 # ACTIVITIES ENDPOINT
 # ------------------------
@@ -1088,7 +1413,7 @@ async def get_recent_activities(user_email: str, limit: int = 10):
     try:
         activities = []
         
-        notifications = read_json_file("notifications.json")
+        notifications = get_collection("notifications.json").find("user_email", user_email)
         user_notifications = [
             {
                 "type": "notification",
@@ -1097,11 +1422,11 @@ async def get_recent_activities(user_email: str, limit: int = 10):
                 "timestamp": n.get("created_at"),
                 "read": n.get("read", False)
             }
-            for n in notifications if n.get("user_email") == user_email
+            for n in notifications
         ]
         activities.extend(user_notifications[:limit])
         
-        applications = read_json_file("applications.json")
+        applications = get_collection("applications.json").find("candidate_email", user_email)
         user_applications = [
             {
                 "type": "application_update",
@@ -1113,7 +1438,7 @@ async def get_recent_activities(user_email: str, limit: int = 10):
                     "status": app.get("status")
                 }
             }
-            for app in applications if app.get("candidate_email") == user_email
+            for app in applications
         ]
         activities.extend(user_applications[:limit])
         
@@ -1138,13 +1463,13 @@ async def health():
 async def get_stats():
     """Get platform statistics"""
     try:
-        candidates = len(read_json_file("candidate.json"))
-        companies = len(read_json_file("company.json"))
-        jobs = len(read_json_file("jobs.json"))
-        applications = len(read_json_file("applications.json"))
-        profiles = len(read_json_file("profiles.json"))
-        notifications = len(read_json_file("notifications.json"))
-        interviews = len(read_json_file("interviews.json"))
+        candidates = get_collection("candidate.json").count()
+        companies = get_collection("company.json").count()
+        jobs = get_collection("jobs.json").count()
+        applications = get_collection("applications.json").count()
+        profiles = get_collection("profiles.json").count()
+        notifications = get_collection("notifications.json").count()
+        interviews = get_collection("interviews.json").count()
         
         return {
             "candidates": candidates,
@@ -1159,6 +1484,11 @@ async def get_stats():
         print(f"Get stats error: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/tasks/metrics")
+async def get_task_metrics():
+    """Background queue depth, lag and outcome counters"""
+    return task_queue.metrics()
+
 @app.post("/reset/{data_type}")
 async def reset_data(data_type: str):
     """Reset data (for testing only)"""
@@ -1167,12 +1497,13 @@ async def reset_data(data_type: str):
             raise HTTPException(status_code=400, detail="Invalid data type")
         
         if data_type == "all":
-            files = ["candidate.json", "company.json", "jobs.json", "applications.json", "profiles.json", "notifications.json", "interviews.json"]
+            files = ["candidate.json", "company.json", "jobs.json", "applications.json", "profiles.json", "notifications.json", "interviews.json", "interview_sessions.json"]
             for file in files:
-                write_json_file(file, [])
+                await write_json_file(file, [])
+            reset_sequences()
             return {"message": "All data reset successfully"}
         else:
-            write_json_file(f"{data_type}.json", [])
+            await write_json_file(f"{data_type}.json", [])
             return {"message": f"{data_type} data reset successfully"}
             
     except HTTPException:
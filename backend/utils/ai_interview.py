@@ -1,13 +1,58 @@
-import openai
-from config import OPENAI_API_KEY
+import asyncio
+from config import INTERVIEW_LATENCY_BUDGET
+from utils.llm_client import get_llm_client
+from utils.question_pool import QuestionPool, question_key
 
-openai.api_key = OPENAI_API_KEY
+def fallback_question(job_role):
+    """
+    Canned question used when the AI service is unavailable.
+    """
+    fallback_questions = {
+        "frontend developer": "Can you explain the difference between React's useState and useEffect hooks?",
+        "backend developer": "How would you design a RESTful API for a blogging platform?",
+        "fullstack developer": "Describe your approach to handling authentication in a web application.",
+        "data scientist": "How would you handle missing data in a dataset before training a model?",
+        "devops engineer": "Explain the concept of Infrastructure as Code and its benefits.",
+        "default": f"For the role of {job_role}, what experience do you have with relevant technologies?"
+    }
+    
+    for key, question in fallback_questions.items():
+        if key in job_role.lower():
+            return question
+    
+    return fallback_questions["default"]
+
+# Served, in order, when the model misses its budget mid-interview and the
+# pool has nothing this session hasn't asked yet
+FOLLOW_UP_FALLBACKS = [
+    "Can you walk me through a specific example from your experience that illustrates your last answer?",
+    "What trade-offs did you weigh in the approach you just described, and what would you change now?",
+    "What was the hardest problem you faced in a similar situation, and how did you solve it?",
+    "How would you explain your last answer to a teammate who is new to the topic?",
+]
 
-def ask_ai_question(job_role, candidate_answer=None):
+def interview_messages(job_role, candidate_answer=None, context=None):
     """
-    Generates AI interview questions for a candidate.
+    Chat messages asking the model for the next interview question.
+    
+    ``context`` is the session history from utils.interview_session,
+    already compacted to a fixed token budget and ending with the
+    candidate's latest answer.
     """
-    if candidate_answer:
+    if context:
+        prompt = f"""
+        You are conducting an interview for the role of {job_role}.
+        
+        The interview so far:
+        {context}
+        
+        Based on the candidate's latest answer, ask the next appropriate technical or behavioral question.
+        Do not repeat a question that has already been asked.
+        
+        Keep the question focused, relevant to the role, and challenging but fair.
+        Maximum 2 sentences.
+        """
+    elif candidate_answer:
         prompt = f"""
         You are conducting an interview for the role of {job_role}.
         
@@ -28,31 +73,112 @@ def ask_ai_question(job_role, candidate_answer=None):
         Maximum 2 sentences.
         """
     
+    return [
+        {"role": "system", "content": "You are a professional technical interviewer."},
+        {"role": "user", "content": prompt}
+    ]
+
+async def generate_question(job_role, candidate_answer=None, context=None):
+    """
+    Asks the model for the next interview question; raises on failure.
+    """
+    return await get_llm_client().chat(
+        interview_messages(job_role, candidate_answer, context),
+        temperature=0.7,
+        max_tokens=100
+    )
+
+# Opening questions only depend on the role, so they can be made ahead of time
+question_pool = QuestionPool(generate_question)
+
+def backup_question(job_role, asked=frozenset()):
+    """
+    Question served when the model is too slow or fails: a pooled one for
+    the role, else the canned one, else a generic follow-up, skipping the
+    ones whose question_key is in ``asked`` (this session's questions).
+    """
+    question = question_pool.take(job_role, skip=asked)
+    if question:
+        return question
+    candidates = [fallback_question(job_role)] + FOLLOW_UP_FALLBACKS
+    return next((q for q in candidates if question_key(q) not in asked), candidates[-1])
+
+async def ask_ai_question(job_role, candidate_answer=None, budget=None, context=None,
+                          asked=frozenset()):
+    """
+    Generates AI interview questions for a candidate.
+    
+    The model gets ``budget`` seconds (INTERVIEW_LATENCY_BUDGET by default).
+    If it is slower than that, or fails, backup_question() is served
+    instead, never one of the session's ``asked`` questions if avoidable.
+    """
+    if budget is None:
+        budget = INTERVIEW_LATENCY_BUDGET
+    opening = not candidate_answer and not context
+    if opening:
+        question_pool.refill(job_role)
+    
+    task = asyncio.ensure_future(generate_question(job_role, candidate_answer, context))
     try:
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional technical interviewer."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=100
-        )
-        return response['choices'][0]['message']['content'].strip()
+        return await asyncio.wait_for(asyncio.shield(task), budget)
+    except asyncio.TimeoutError:
+        print(f"AI question for '{job_role}' exceeded {budget}s, serving a pooled question")
+        if not opening:
+            task.cancel()
+        else:
+            # Don't waste the late answer: it is a valid opening question
+            task.add_done_callback(
+                lambda t: question_pool.add(job_role, t.result())
+                if not t.cancelled() and t.exception() is None else None
+            )
     except Exception as e:
         print(f"OpenAI API error: {str(e)}")
-        # Fallback questions
-        fallback_questions = {
-            "frontend developer": "Can you explain the difference between React's useState and useEffect hooks?",
-            "backend developer": "How would you design a RESTful API for a blogging platform?",
-            "fullstack developer": "Describe your approach to handling authentication in a web application.",
-            "data scientist": "How would you handle missing data in a dataset before training a model?",
-            "devops engineer": "Explain the concept of Infrastructure as Code and its benefits.",
-            "default": f"For the role of {job_role}, what experience do you have with relevant technologies?"
-        }
-        
-        for key, question in fallback_questions.items():
-            if key in job_role.lower():
-                return question
-        
-        return fallback_questions["default"]
\ No newline at end of file
+    
+    return backup_question(job_role, asked)
+
+async def stream_ai_question(job_role, candidate_answer=None, budget=None, context=None,
+                             asked=frozenset()):
+    """
+    Streams an AI interview question as (event, data) pairs.
+    
+    Tokens are forwarded as ("token", {"text": ...}) as soon as the model
+    produces them, and the finished question as ("done", {"question": ...}).
+    If the first token misses ``budget`` or the model fails before it,
+    backup_question() is sent as the only "done" event. If the model fails
+    mid-stream, a ("replace", {"question": ...}) event tells the client to
+    discard the partial text.
+    """
+    if budget is None:
+        budget = INTERVIEW_LATENCY_BUDGET
+    opening = not candidate_answer and not context
+    if opening:
+        question_pool.refill(job_role)
+    
+    tokens = get_llm_client().stream_chat(
+        interview_messages(job_role, candidate_answer, context),
+        temperature=0.7,
+        max_tokens=100
+    )
+    parts = []
+    try:
+        first = await asyncio.wait_for(tokens.__anext__(), budget)
+        parts.append(first)
+        yield "token", {"text": first}
+        async for token in tokens:
+            parts.append(token)
+            yield "token", {"text": token}
+        yield "done", {"question": "".join(parts).strip()}
+        return
+    except StopAsyncIteration:
+        print(f"OpenAI API error: empty completion for '{job_role}'")
+    except asyncio.TimeoutError:
+        print(f"AI question for '{job_role}' exceeded {budget}s, serving a pooled question")
+    except Exception as e:
+        print(f"OpenAI API error: {str(e)}")
+    finally:
+        await tokens.aclose()
+    
+    question = backup_question(job_role, asked)
+    if parts:
+        yield "replace", {"question": question}
+    yield "done", {"question": question}
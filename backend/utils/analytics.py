@@ -0,0 +1,103 @@
+"""
+The numbers behind the analytics endpoints.
+
+Every count is a tally the storage layer keeps up to date as jobs,
+applications and interviews are written (TALLIES in utils.storage), per
+candidate, per job and per company, and the recent applications come from
+the applied_date sorted indexes. So the dashboards read a handful of
+numbers and pages instead of scanning applications and interviews, and
+with SQLite they include every worker's writes without any rebuild.
+"""
+import heapq
+from itertools import islice
+
+from utils.storage import get_collection
+
+# Length of the "recent_applications" lists
+RECENT_LIMIT = 10
+
+CANDIDATE_STATUSES = (
+    "applied", "reviewed", "interview_scheduled", "interview_completed", "accepted", "rejected"
+)
+COMPANY_STATUSES = ("applied", "interview_scheduled", "interview_completed", "accepted")
+
+
+def _total(totals):
+    return sum(totals.values())
+
+
+def _by_last(totals):
+    """{group: value} -> {last group value: summed value}"""
+    summed = {}
+    for group, value in totals.items():
+        summed[group[-1]] = summed.get(group[-1], 0) + value
+    return summed
+
+
+def _newest(applications, field, value):
+    return applications.page(field, value, order_by="applied_date", limit=RECENT_LIMIT)[0]
+
+
+class Analytics:
+    def candidate_stats(self, email):
+        """(statistics, most recent applications) for a candidate"""
+        applications = get_collection("applications.json")
+        statuses = _by_last(applications.tallies(
+            "by_candidate_status", [(email, status) for status in CANDIDATE_STATUSES]
+        ))
+        stats = {
+            "total_applications": applications.tally("by_candidate", email),
+            **{status: statuses.get(status, 0) for status in CANDIDATE_STATUSES},
+            "interview_count": get_collection("interviews.json").tally("by_candidate", email)
+        }
+        return stats, _newest(applications, "candidate_email", email)
+
+    def company_stats(self, email, job_ids=None, recent=True):
+        """
+        (statistics, most recent applications) for a company; ``job_ids``
+        saves looking its jobs up again. Counts cover the applications and
+        interviews of the company's current jobs.
+        """
+        jobs = get_collection("jobs.json")
+        applications = get_collection("applications.json")
+        interviews = get_collection("interviews.json")
+        if job_ids is None:
+            job_ids = [job.get("id") for job in jobs.find("company_email", email)]
+        groups = [(job_id,) for job_id in job_ids]
+
+        job_statuses = _by_last(jobs.tallies(
+            "by_company_status", [(email, "open"), (email, "closed")]
+        ))
+        statuses = _by_last(applications.tallies(
+            "by_job_status", [(job_id, status) for job_id in job_ids for status in COMPANY_STATUSES]
+        ))
+        interview_count = _total(interviews.tallies("by_job", groups))
+        stats = {
+            "total_jobs": jobs.tally("by_company", email),
+            "open_jobs": job_statuses.get("open", 0),
+            "closed_jobs": job_statuses.get("closed", 0),
+            "total_applications": _total(applications.tallies("by_job", groups)),
+            "new_applications": statuses.get("applied", 0),
+            "interview_scheduled": statuses.get("interview_scheduled", 0),
+            "interview_completed": statuses.get("interview_completed", 0),
+            "hired": statuses.get("accepted", 0),
+            "total_interviews": interview_count,
+            "avg_interview_score": 0
+        }
+        if interview_count:
+            score_sum = _total(interviews.tallies("score_by_job", groups))
+            stats["avg_interview_score"] = round(score_sum / interview_count, 1)
+
+        if not recent:
+            return stats, []
+        # Each job's page is newest first already, so merging them is
+        # O(jobs x RECENT_LIMIT) whatever the number of applications
+        pages = [_newest(applications, "job_id", job_id) for job_id in job_ids]
+        merged = heapq.merge(
+            *pages, key=lambda app: app.get("applied_date") or "", reverse=True
+        )
+        return stats, list(islice(merged, RECENT_LIMIT))
+
+
+# Shared by the endpoints in main.py
+analytics = Analytics()
@@ -0,0 +1,112 @@
+"""
+JSON encoding for the data files and the API responses.
+
+Uses orjson (see requirements.txt) and falls back to the standard library
+when it isn't installed or can't handle a value (integers over 64 bits,
+NaN written by older versions). Data files are written compact; indented
+files from before are still read as they are and become compact on their
+next write, or all at once with:
+
+    python -m utils.storage compact [--models models]
+
+Compare the codecs on the data files with:
+
+    python -m utils.codec [--models models] [--scale 1000]
+"""
+import argparse
+import json
+import os
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(obj, default=None):
+    """Compact UTF-8 JSON; ``default`` converts values JSON has no type for"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dumps(obj, default=None):
+    """Compact JSON as text"""
+    return dumps_bytes(obj, default).decode()
+
+
+def loads(data):
+    """Parse JSON text or bytes; raises json.JSONDecodeError like json.loads"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def _best_time(fn, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(models_folder, scale=1000, rounds=5):
+    """
+    Encode/decode timings of the old format (json, indent=2) against this
+    codec for each data file, with its records repeated up to ``scale``.
+    Returns a list of result dicts.
+    """
+    results = []
+    for filename in sorted(os.listdir(models_folder)):
+        if not filename.endswith(".json") or filename.startswith("_"):
+            continue
+        with open(os.path.join(models_folder, filename), "rb") as f:
+            records = loads(f.read() or b"[]")
+        if not isinstance(records, list) or not records:
+            continue
+        records = [records[i % len(records)] for i in range(max(scale, len(records)))]
+
+        old = json.dumps(records, indent=2)
+        new = dumps_bytes(records)
+        results.append({
+            "file": filename,
+            "records": len(records),
+            "old_bytes": len(old.encode()),
+            "new_bytes": len(new),
+            "old_encode": _best_time(lambda: json.dumps(records, indent=2), rounds),
+            "new_encode": _best_time(lambda: dumps_bytes(records), rounds),
+            "old_decode": _best_time(lambda: json.loads(old), rounds),
+            "new_decode": _best_time(lambda: loads(new), rounds),
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the JSON codec on the data files")
+    parser.add_argument("--models", default="models")
+    parser.add_argument("--scale", type=int, default=1000,
+                        help="repeat each file's records up to this many")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"codec: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    print(f"{'file':<24}{'records':>8}{'size':>16}{'encode ms':>20}{'decode ms':>20}")
+    for r in benchmark(args.models, args.scale, args.rounds):
+        print(
+            f"{r['file']:<24}{r['records']:>8}"
+            f"{r['old_bytes'] // 1024:>7}K -> {r['new_bytes'] // 1024:>4}K"
+            f"{r['old_encode'] * 1000:>10.2f} -> {r['new_encode'] * 1000:>6.2f}"
+            f"{r['old_decode'] * 1000:>10.2f} -> {r['new_decode'] * 1000:>6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
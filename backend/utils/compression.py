@@ -0,0 +1,126 @@
+"""
+gzip/brotli compression of large responses.
+
+Brotli (see requirements.txt) is used when the client accepts it and the
+module is installed, gzip otherwise. Only complete bodies are compressed:
+streamed responses such as /interview/stream pass through untouched, so
+their chunks still reach the client as soon as they are sent.
+"""
+import asyncio
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config import COMPRESS_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+# Bodies at least this large are compressed in a worker thread, keeping
+# the event loop free for other requests
+THREAD_THRESHOLD = 64 * 1024
+
+
+def _accepted(accept_encoding):
+    """Codings the client accepts (q > 0), lowercased"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies of at least ``minimum_size`` bytes whose
+    content type is in COMPRESSIBLE_TYPES. A strong ETag on a compressed
+    response becomes weak, since the bytes differ from the identity
+    encoding; If-None-Match compares weakly, so revalidation still works.
+    """
+
+    def __init__(self, app, minimum_size=COMPRESS_MIN_SIZE, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, accept_encoding):
+        accepted = _accepted(accept_encoding)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def compressing_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held until the body shows whether it is worth compressing
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=held["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(held)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) < self.minimum_size:
+                await send(held)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_THRESHOLD:
+                body = await asyncio.to_thread(self._compress, body, encoding)
+            else:
+                body = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            tag = headers.get("etag")
+            if tag and not tag.startswith("W/"):
+                headers["ETag"] = "W/" + tag
+            await send(held)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,158 @@
+import asyncio
+import time
+
+from utils.codec import dumps
+from utils.pubsub import LocalPubSub
+
+PING = dumps({"type": "ping"})
+
+
+class Connection:
+    """One WebSocket with its own outgoing queue"""
+
+    def __init__(self, websocket, user_email, queue_size):
+        self.websocket = websocket
+        self.user_email = user_email
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.last_seen = time.monotonic()
+        self.closed = False
+        self.writer = None
+
+    def touch(self):
+        """Record that the client is alive (it sent something)"""
+        self.last_seen = time.monotonic()
+
+
+class ConnectionManager:
+    """
+    Tracks every open WebSocket, any number per user.
+
+    Sending never waits on a client: messages go into the connection's
+    bounded queue and a writer task per connection drains it, so one slow
+    socket can't hold up the others. A connection whose queue overflows,
+    or whose send takes longer than SEND_TIMEOUT, is dropped. Every
+    HEARTBEAT_INTERVAL seconds each connection is pinged and the ones that
+    haven't sent anything for IDLE_TIMEOUT seconds are closed.
+
+    Messages are also handed to ``pubsub`` (see utils/pubsub.py) so users
+    connected to other worker processes get them too.
+    """
+
+    SEND_QUEUE_SIZE = 100
+    SEND_TIMEOUT = 10.0
+    HEARTBEAT_INTERVAL = 20.0
+    IDLE_TIMEOUT = 60.0
+
+    def __init__(self, pubsub=None):
+        self.active_connections = {}
+        self.pubsub = pubsub or LocalPubSub()
+        self._heartbeat = None
+        self._closing = set()
+
+    async def start(self):
+        await self.pubsub.start(self._deliver)
+
+    def connection_count(self):
+        return sum(len(connections) for connections in self.active_connections.values())
+
+    async def connect(self, websocket, user_email):
+        await websocket.accept()
+        connection = Connection(websocket, user_email, self.SEND_QUEUE_SIZE)
+        connection.writer = asyncio.create_task(self._write(connection))
+        self.active_connections.setdefault(user_email, set()).add(connection)
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        return connection
+
+    def disconnect(self, connection):
+        if connection.closed:
+            return
+        connection.closed = True
+        connections = self.active_connections.get(connection.user_email)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self.active_connections[connection.user_email]
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+
+    def _drop(self, connection, code):
+        """Disconnect and close the socket without making the caller wait"""
+        if connection.closed:
+            return
+        self.disconnect(connection)
+        task = asyncio.create_task(self._close_socket(connection, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_socket(self, connection, code):
+        try:
+            await asyncio.wait_for(connection.websocket.close(code=code), self.SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    def _enqueue(self, connection, message):
+        try:
+            connection.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            print(f"Dropping slow WebSocket consumer for {connection.user_email}")
+            # 1013: try again later
+            self._drop(connection, 1013)
+
+    async def _write(self, connection):
+        try:
+            while True:
+                message = await connection.queue.get()
+                await asyncio.wait_for(
+                    connection.websocket.send_text(message), self.SEND_TIMEOUT
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 1011: the socket is broken or too slow
+            self._drop(connection, 1011)
+
+    async def _heartbeat_loop(self):
+        while self.active_connections:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            now = time.monotonic()
+            for connections in list(self.active_connections.values()):
+                for connection in list(connections):
+                    if now - connection.last_seen > self.IDLE_TIMEOUT:
+                        # 1001: going away
+                        self._drop(connection, 1001)
+                    else:
+                        self._enqueue(connection, PING)
+
+    def _deliver(self, event):
+        """Queue an event for the sockets connected to this process"""
+        if event.get("type") == "personal":
+            targets = [self.active_connections.get(event.get("user_email"), ())]
+        elif event.get("type") == "broadcast":
+            targets = list(self.active_connections.values())
+        else:
+            return
+        for connections in targets:
+            for connection in list(connections):
+                self._enqueue(connection, event["message"])
+
+    async def send_personal_message(self, message: str, user_email: str):
+        event = {"type": "personal", "user_email": user_email, "message": message}
+        self._deliver(event)
+        await self.pubsub.publish(event)
+
+    async def broadcast(self, message: str):
+        event = {"type": "broadcast", "message": message}
+        self._deliver(event)
+        await self.pubsub.publish(event)
+
+    async def close(self):
+        """Close every connection (shutdown)"""
+        await self.pubsub.close()
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                self._drop(connection, 1001)
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
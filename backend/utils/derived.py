@@ -0,0 +1,34 @@
+"""
+Base class of the in-memory structures derived from collections: the job
+and skill indexes and the job search index.
+
+Each is patched by write hooks as this process changes the records, and
+rebuilt by sync() when a collection's ``generation`` moved, i.e. when the
+records changed in a way the hooks didn't see: replaced wholesale,
+reloaded from disk, or written by another process sharing the SQLite
+database.
+"""
+
+
+class DerivedIndex:
+    # Generations of the source collections as of the last sync; None
+    # until the first one
+    generations = None
+
+    def rebuild(self, *records):
+        """Start over from the records of each source collection"""
+        raise NotImplementedError
+
+    def in_sync(self, *collections):
+        return self.generations == tuple(collection.generation for collection in collections)
+
+    def mark_synced(self, *collections):
+        self.generations = tuple(collection.generation for collection in collections)
+
+    def sync(self, *collections):
+        """Rebuild from ``collections`` if they changed since the last sync"""
+        for collection in collections:
+            collection.refresh()
+        if not self.in_sync(*collections):
+            self.rebuild(*(collection.read() for collection in collections))
+            self.mark_synced(*collections)
@@ -0,0 +1,63 @@
+"""
+ETags for the GET endpoints the dashboards poll.
+
+An endpoint's ETag is derived from the version() tokens of the data it
+reads - a whole collection, or the slice of it for one user or job - so
+checking If-None-Match costs a few counter lookups and a 304 is answered
+without reading or encoding any records:
+
+    tag = etag(("notifications.json", "user_email", user_email))
+    if not_modified(request, tag):
+        return not_modified_response(tag)
+    ...
+    return tagged(content, tag)
+
+Compute the tag before reading: a write landing in between then makes the
+tag older than the body, which costs the client one extra full response
+instead of hiding the change from it.
+"""
+import hashlib
+
+from starlette.responses import Response
+
+from utils.responses import FastJSONResponse
+from utils.storage import get_collection
+
+# Clients may keep responses but must revalidate them on every use
+CACHE_CONTROL = "no-cache"
+
+
+def etag(*slices):
+    """
+    Strong ETag for the current versions of ``slices``, each either
+    (filename,) for a whole collection or (filename, field, value) for
+    the records whose indexed ``field`` equals ``value``.
+    """
+    versions = "|".join(
+        f"{filename}:{get_collection(filename).version(*rest)}" for filename, *rest in slices
+    )
+    return '"' + hashlib.blake2b(versions.encode(), digest_size=12).hexdigest() + '"'
+
+
+def not_modified(request, tag):
+    """True if the request's If-None-Match already names ``tag``"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        # Weak comparison, as RFC 9110 asks for If-None-Match
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in (tag, "*"):
+            return True
+    return False
+
+
+def not_modified_response(tag):
+    return Response(status_code=304, headers={"ETag": tag, "Cache-Control": CACHE_CONTROL})
+
+
+def tagged(content, tag):
+    """``content`` as a JSON response carrying ``tag``"""
+    return FastJSONResponse(content, headers={"ETag": tag, "Cache-Control": CACHE_CONTROL})
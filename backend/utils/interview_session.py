@@ -0,0 +1,150 @@
+from datetime import datetime
+
+from config import INTERVIEW_CONTEXT_TOKENS
+from utils.question_pool import question_key
+from utils.storage import StorageError, get_collection, insert_record, update_record
+
+SESSIONS_FILE = "interview_sessions.json"
+
+# Share of the context budget kept for verbatim recent turns; the rest
+# holds one-line digests of the older ones
+RECENT_SHARE = 0.6
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def _clip(text, limit):
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def _turn_text(turn):
+    text = f"Q: {turn['question']}"
+    if turn.get("answer"):
+        text += f"\nA: {turn['answer']}"
+    return text
+
+
+def _digest(turn):
+    line = f"- {_clip(turn['question'], 100)}"
+    if turn.get("answer"):
+        line += f" (answered: {_clip(turn['answer'], 60)})"
+    return line
+
+
+def compact_history(summary, turns, budget=INTERVIEW_CONTEXT_TOKENS):
+    """
+    Fit a session's history into ``budget`` tokens.
+
+    The newest turns are kept verbatim while they fit in their share of the
+    budget; older ones are folded into ``summary`` as one-line digests, and
+    the oldest digests are dropped once the summary is full. Returns the
+    new (summary, turns) pair, so stored sessions stay bounded too.
+    """
+    recent_budget = int(budget * RECENT_SHARE)
+    summary = list(summary)
+    turns = list(turns)
+
+    used = sum(estimate_tokens(_turn_text(t)) for t in turns)
+    # Always keep the last turn, it is the one being answered
+    while len(turns) > 1 and used > recent_budget:
+        oldest = turns.pop(0)
+        used -= estimate_tokens(_turn_text(oldest))
+        summary.append(_digest(oldest))
+
+    summary_budget = max(budget - used, 0)
+    while summary and sum(estimate_tokens(line) for line in summary) > summary_budget:
+        summary.pop(0)
+    return summary, turns
+
+
+def history_context(session, candidate_answer=None):
+    """Prompt text describing the interview so far (empty for a new session)"""
+    turns = [dict(t) for t in session.get("turns", [])]
+    if candidate_answer and turns and not turns[-1].get("answer"):
+        turns[-1]["answer"] = candidate_answer
+    summary, turns = compact_history(session.get("summary", []), turns)
+
+    parts = []
+    if summary:
+        parts.append("Earlier questions:\n" + "\n".join(summary))
+    if turns:
+        parts.append("Most recent exchange:\n" + "\n\n".join(_turn_text(t) for t in turns))
+    return "\n\n".join(parts)
+
+
+def asked_questions(session):
+    """question_key of every question the session asked, digested ones included"""
+    asked = set(session.get("asked", []))
+    asked.update(question_key(t["question"]) for t in session.get("turns", []))
+    return asked
+
+
+def get_session(application_id):
+    return get_collection(SESSIONS_FILE).find_one("application_id", str(application_id))
+
+
+def get_session_by_id(session_id):
+    return get_collection(SESSIONS_FILE).get(str(session_id))
+
+
+async def start_session(job_role, application_id=None):
+    """Store a new, empty interview session; practice ones have no application"""
+    now = datetime.now().isoformat()
+    session = {
+        "id": get_collection(SESSIONS_FILE).next_id(),
+        "application_id": str(application_id) if application_id is not None else None,
+        "job_role": job_role,
+        "summary": [],
+        "turns": [],
+        # question_key of every question, kept after the summary drops it
+        "asked": [],
+        "questions_asked": 0,
+        "created_at": now,
+        "updated_at": now
+    }
+    if not await insert_record(SESSIONS_FILE, session):
+        raise StorageError(f"Failed to write {SESSIONS_FILE}")
+    return session
+
+
+async def load_session(application_id, job_role):
+    """Return the application's interview session, starting one if needed"""
+    session = get_session(application_id)
+    if session is not None:
+        return session
+
+    # Checked again under the lock: two first questions for the same
+    # application must not both start a session
+    async with get_collection(SESSIONS_FILE).lock:
+        session = get_session(application_id)
+        if session is None:
+            session = await start_session(job_role, application_id)
+    return session
+
+
+async def record_turn(session, candidate_answer, question):
+    """Store the answer to the last question and the next question asked"""
+    async with get_collection(SESSIONS_FILE).lock:
+        # Build on the stored session, not the caller's copy, so turns
+        # recorded concurrently don't overwrite each other
+        session = get_session_by_id(session["id"]) or session
+        turns = [dict(t) for t in session.get("turns", [])]
+        if candidate_answer and turns and not turns[-1].get("answer"):
+            turns[-1]["answer"] = candidate_answer
+        turns.append({"question": question, "answer": ""})
+        summary, turns = compact_history(session.get("summary", []), turns)
+
+        changes = {
+            "summary": summary,
+            "turns": turns,
+            "asked": session.get("asked", []) + [question_key(question)],
+            "questions_asked": session.get("questions_asked", 0) + 1,
+            "updated_at": datetime.now().isoformat()
+        }
+        await update_record(SESSIONS_FILE, session["id"], changes)
+    session.update(changes)
+    return session
@@ -0,0 +1,110 @@
+import heapq
+import math
+
+from utils.derived import DerivedIndex
+
+
+def job_terms(job):
+    """Lowercased words longer than 3 characters from a job's searchable text"""
+    text = f"{job.get('title', '')} {job.get('description', '')} {' '.join(job.get('requirements', []))} {' '.join(job.get('tags', []))}"
+    return [word.lower() for word in text.split() if len(word) > 3]
+
+
+class JobIndex(DerivedIndex):
+    """
+    Inverted index over the text of open jobs, scored with BM25.
+
+    ``postings`` maps a term to {job_id: term frequency}, so a search only
+    touches the postings of the query terms and keeps the best ``k`` in a
+    heap; the size of the catalog doesn't matter. Jobs are added and
+    removed as they are created and deleted. sync() rebuilds the whole
+    index when the jobs changed in a way those hooks didn't see (see
+    utils.derived).
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self._doc_terms = {}
+        self._doc_len = {}
+        self._order = {}
+        self._total_len = 0
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self._doc_len)
+
+    def add(self, job):
+        job_id = job.get("id")
+        if job_id is None or job.get("status") != "open":
+            return
+        self.remove(job_id)
+
+        terms = job_terms(job)
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[job_id] = tf
+
+        self._doc_terms[job_id] = tuple(counts)
+        self._doc_len[job_id] = len(terms)
+        self._total_len += len(terms)
+        self._order[job_id] = self._next_order
+        self._next_order += 1
+
+    def remove(self, job_id):
+        terms = self._doc_terms.pop(job_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(job_id, None)
+                if not posting:
+                    del self.postings[term]
+        self._total_len -= self._doc_len.pop(job_id)
+        del self._order[job_id]
+
+    def rebuild(self, jobs):
+        self.postings = {}
+        self._doc_terms = {}
+        self._doc_len = {}
+        self._order = {}
+        self._total_len = 0
+        self._next_order = 0
+        for job in jobs:
+            self.add(job)
+
+    def search(self, terms, k=20):
+        """
+        Return up to ``k`` (job_id, score, matched_terms) tuples, best
+        first. Ties keep catalog order.
+        """
+        n = len(self._doc_len)
+        if not n:
+            return []
+        avg_len = self._total_len / n or 1
+
+        scores = {}
+        matched = {}
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for job_id, tf in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_len[job_id] / avg_len)
+                scores[job_id] = scores.get(job_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                matched.setdefault(job_id, []).append(term)
+
+        best = heapq.nsmallest(
+            k, scores.items(), key=lambda item: (-item[1], self._order[item[0]])
+        )
+        return [(job_id, score, matched[job_id]) for job_id, score in best]
+
+
+# Shared by the job endpoints in main.py
+job_index = JobIndex()
@@ -0,0 +1,236 @@
+import bisect
+import heapq
+import re
+
+from utils.derived import DerivedIndex
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+# Weight of a query term found in each part of a job, for relevance
+TEXT_FIELDS = {"title": 3.0, "tags": 2.0, "requirements": 2.0, "company_name": 1.0, "description": 1.0}
+
+# Filters matched exactly (case-insensitively) against one job field
+EXACT_FILTERS = {
+    "tags": "tags",
+    "experience_level": "experience_level",
+    "status": "status",
+    "company": "company_email",
+}
+
+SORTS = ("relevance", "newest", "oldest", "title")
+
+# Length of the description excerpt returned with each result
+SUMMARY_LENGTH = 160
+
+SUMMARY_FIELDS = (
+    "id", "title", "company_name", "company_email", "location", "salary",
+    "experience_level", "tags", "status", "created_date"
+)
+
+
+def tokens(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+def _field_text(value):
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return value or ""
+
+
+def job_summary(job):
+    """The fields a search result carries, with a short excerpt instead of the description"""
+    summary = {field: job.get(field) for field in SUMMARY_FIELDS if field in job}
+    description = job.get("description") or ""
+    summary["summary"] = (
+        description if len(description) <= SUMMARY_LENGTH
+        else description[:SUMMARY_LENGTH].rstrip() + "..."
+    )
+    return summary
+
+
+class PrefixIndex:
+    """
+    Term -> {doc id: weight} with the terms also kept sorted, so a query
+    word matches every term it is a prefix of ("reac" finds "react").
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self._terms = []
+        self._doc_terms = {}
+
+    def add(self, doc_id, weights):
+        self.remove(doc_id)
+        for term, weight in weights.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                bisect.insort(self._terms, term)
+            posting[doc_id] = weight
+        self._doc_terms[doc_id] = tuple(weights)
+
+    def remove(self, doc_id):
+        for term in self._doc_terms.pop(doc_id, ()):
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def match(self, prefix):
+        """{doc id: best weight} over the terms starting with ``prefix``"""
+        matched = {}
+        i = bisect.bisect_left(self._terms, prefix)
+        while i < len(self._terms) and self._terms[i].startswith(prefix):
+            for doc_id, weight in self.postings[self._terms[i]].items():
+                if weight > matched.get(doc_id, 0):
+                    matched[doc_id] = weight
+            i += 1
+        return matched
+
+
+class JobSearchIndex(DerivedIndex):
+    """
+    Everything /jobs/search filters and sorts on, for every job.
+
+    The words of a job's title, tags, requirements, company and
+    description go into one PrefixIndex, weighted by TEXT_FIELDS, and the
+    words of its location into another; the EXACT_FILTERS fields are kept
+    as value -> ids sets. A search intersects the smallest candidate sets
+    first and picks the requested page with a heap, so only one page is
+    ever sorted. Jobs are added and removed as they are created and
+    deleted; sync() rebuilds the index when the jobs changed in a way
+    those hooks didn't see (see utils.derived).
+    """
+
+    def __init__(self):
+        self.text = PrefixIndex()
+        self.location = PrefixIndex()
+        self.exact = {name: {} for name in EXACT_FILTERS}
+        self._docs = {}
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, job):
+        job_id = job.get("id")
+        if job_id is None:
+            return
+        self.remove(job_id)
+
+        weights = {}
+        for field, weight in TEXT_FIELDS.items():
+            for term in tokens(_field_text(job.get(field))):
+                weights[term] = max(weights.get(term, 0), weight)
+        self.text.add(job_id, weights)
+        self.location.add(job_id, dict.fromkeys(tokens(job.get("location") or ""), 1.0))
+
+        values = {}
+        for name, field in EXACT_FILTERS.items():
+            value = job.get(field)
+            field_values = {str(v).lower() for v in (value if isinstance(value, list) else [value]) if v}
+            for v in field_values:
+                self.exact[name].setdefault(v, set()).add(job_id)
+            values[name] = field_values
+
+        self._docs[job_id] = {
+            "order": self._next_order,
+            "created": job.get("created_date") or "",
+            "title": (job.get("title") or "").lower(),
+            "values": values,
+        }
+        self._next_order += 1
+
+    def remove(self, job_id):
+        doc = self._docs.pop(job_id, None)
+        if doc is None:
+            return
+        self.text.remove(job_id)
+        self.location.remove(job_id)
+        for name, field_values in doc["values"].items():
+            for v in field_values:
+                ids = self.exact[name][v]
+                ids.discard(job_id)
+                if not ids:
+                    del self.exact[name][v]
+
+    def rebuild(self, jobs):
+        self.text = PrefixIndex()
+        self.location = PrefixIndex()
+        self.exact = {name: {} for name in EXACT_FILTERS}
+        self._docs = {}
+        self._next_order = 0
+        for job in jobs:
+            self.add(job)
+
+    def _sort_key(self, sort, job_id, score):
+        doc = self._docs[job_id]
+        if sort == "relevance":
+            return (score, -doc["order"])
+        if sort == "title":
+            return (doc["title"], doc["order"])
+        return (doc["created"], doc["order"])
+
+    def search(self, query="", location="", filters=None, sort=None, limit=20, after=None):
+        """
+        Return (job ids of one page, total matches, key of the last
+        result or None when there are no more). ``filters`` maps
+        EXACT_FILTERS names to a value or a list of values that must all
+        match. Raises ValueError for an unknown sort or a bad ``after``.
+        """
+        query_terms = tokens(query)
+        sort = sort or ("relevance" if query_terms else "newest")
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {', '.join(SORTS)}")
+
+        candidate_sets = []
+        for name, wanted in (filters or {}).items():
+            for value in (wanted if isinstance(wanted, list) else [wanted]):
+                candidate_sets.append(self.exact[name].get(str(value).lower(), set()))
+        for term in tokens(location):
+            candidate_sets.append(self.location.match(term).keys())
+
+        scores = None
+        for term in query_terms:
+            matched = self.text.match(term)
+            if scores is None:
+                scores = matched
+            else:
+                scores = {job_id: s + matched[job_id] for job_id, s in scores.items() if job_id in matched}
+            if not scores:
+                break
+
+        if scores is not None:
+            candidate_sets.append(scores.keys())
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            matches = set(candidate_sets[0])
+            for ids in candidate_sets[1:]:
+                matches.intersection_update(ids)
+                if not matches:
+                    break
+        else:
+            matches = self._docs.keys()
+
+        keyed = ((self._sort_key(sort, job_id, scores[job_id] if scores else 0), job_id) for job_id in matches)
+        descending = sort in ("relevance", "newest")
+        try:
+            if after is not None:
+                after = tuple(after)
+                keyed = [(key, job_id) for key, job_id in keyed
+                         if (key < after if descending else key > after)]
+            pick = heapq.nlargest if descending else heapq.nsmallest
+            page = pick(limit + 1, keyed, key=lambda item: item[0])
+        except TypeError:
+            raise ValueError("Invalid cursor")
+
+        more = len(page) > limit
+        page = page[:limit]
+        next_key = list(page[-1][0]) if more else None
+        return [job_id for _, job_id in page], len(matches), next_key
+
+
+# Shared by the job endpoints in main.py
+job_search_index = JobSearchIndex()
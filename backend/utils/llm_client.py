@@ -0,0 +1,168 @@
+import asyncio
+import random
+
+import aiohttp
+
+from config import OPENAI_API_KEY, OPENAI_BASE_URL
+from utils.codec import dumps, loads
+
+
+class LLMError(Exception):
+    """The model could not produce a completion"""
+
+
+# Worth another attempt; anything else (bad request, auth) will fail again
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMClient:
+    """
+    Async chat-completions client.
+
+    One pooled aiohttp session is shared by every call, a semaphore caps
+    how many requests are in flight upstream, each attempt has its own
+    timeout, and transient failures are retried with full-jitter
+    exponential backoff. ``base_url`` can point at a local stub server.
+    """
+
+    def __init__(self, api_key, base_url, model="gpt-3.5-turbo", timeout=10.0,
+                 max_concurrency=8, max_retries=2, backoff_base=0.5):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._session = None
+        self._semaphore = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                json_serialize=dumps
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    def _backoff(self, attempt):
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    async def chat(self, messages, temperature=0.7, max_tokens=100, timeout=None):
+        """Return the content of the first choice for ``messages``"""
+        session = self._get_session()
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+            try:
+                async with self._semaphore:
+                    async with session.post(
+                        f"{self.base_url}/chat/completions",
+                        json=payload,
+                        timeout=request_timeout
+                    ) as response:
+                        if response.status in RETRY_STATUSES:
+                            last_error = LLMError(f"Upstream returned {response.status}")
+                            continue
+                        if response.status >= 400:
+                            raise LLMError(f"Upstream returned {response.status}: {await response.text()}")
+                        body = await response.json(loads=loads)
+                return body["choices"][0]["message"]["content"].strip()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = LLMError(f"Upstream request failed: {e!r}")
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise LLMError(f"Unexpected completion payload: {e!r}")
+
+        raise last_error
+
+    async def stream_chat(self, messages, temperature=0.7, max_tokens=100, timeout=None):
+        """
+        Yield content deltas of the first choice as the model produces them.
+
+        Attempts are only retried until the first delta has been yielded;
+        after that a failure raises LLMError, since the caller has already
+        shown part of the answer. ``timeout`` bounds the wait for each chunk.
+        """
+        session = self._get_session()
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        request_timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=timeout or self.timeout, sock_read=timeout or self.timeout
+        )
+        last_error = None
+        started = False
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+            try:
+                async with self._semaphore:
+                    async with session.post(
+                        f"{self.base_url}/chat/completions",
+                        json=payload,
+                        timeout=request_timeout
+                    ) as response:
+                        if response.status in RETRY_STATUSES:
+                            last_error = LLMError(f"Upstream returned {response.status}")
+                            continue
+                        if response.status >= 400:
+                            raise LLMError(f"Upstream returned {response.status}: {await response.text()}")
+                        async for line in response.content:
+                            line = line.decode("utf-8").strip()
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:"):].strip()
+                            if data == "[DONE]":
+                                return
+                            delta = loads(data)["choices"][0].get("delta", {}).get("content")
+                            if delta:
+                                started = True
+                                yield delta
+                # The connection closed without the [DONE] marker
+                last_error = LLMError("Upstream stream ended early")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = LLMError(f"Upstream request failed: {e!r}")
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise LLMError(f"Unexpected completion chunk: {e!r}")
+            if started:
+                raise last_error
+
+        raise last_error
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_client = None
+
+
+def get_llm_client():
+    """Return the process-wide client configured from config.py"""
+    global _client
+    if _client is None:
+        _client = LLMClient(OPENAI_API_KEY, OPENAI_BASE_URL)
+    return _client
+
+
+async def close_llm_client():
+    if _client is not None:
+        await _client.close()
@@ -0,0 +1,26 @@
+import base64
+import binascii
+
+from utils.codec import dumps_bytes, loads
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(key):
+    """Opaque cursor for a page key returned by Collection.page()"""
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(dumps_bytes(key)).decode()
+
+
+def decode_cursor(cursor):
+    """Page key inside a cursor from encode_cursor(); ValueError if it isn't one"""
+    try:
+        key = loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    # (value, pos) from SQLite, (value, id, seq) from the JSON collections
+    if not isinstance(key, list) or len(key) not in (2, 3):
+        raise ValueError("Invalid cursor")
+    return key
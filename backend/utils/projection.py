@@ -0,0 +1,49 @@
+def parse_fields(fields):
+    """
+    Parse a ``fields`` query parameter such as
+    "id,status,job_details.title" into a projection tree,
+    {"id": None, "status": None, "job_details": {"title": None}}, where
+    None keeps the whole value. Returns None (every field) when
+    ``fields`` is missing or empty; raises ValueError for an empty name.
+    """
+    if not fields:
+        return None
+    tree = {}
+    for path in fields.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        names = path.split(".")
+        if not all(names):
+            raise ValueError(f"Invalid field: {path}")
+        node = tree
+        for name in names[:-1]:
+            if name in node and node[name] is None:
+                # The whole value is already kept
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[names[-1]] = None
+    return tree or None
+
+
+def wants(tree, field):
+    """Whether a projection keeps any part of ``field``"""
+    return tree is None or field in tree
+
+
+def project(value, tree):
+    """
+    The parts of ``value`` that ``tree`` keeps; lists are projected item
+    by item and fields a record doesn't have are left out.
+    """
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        field: value[field] if subtree is None else project(value[field], subtree)
+        for field, subtree in tree.items() if field in value
+    }
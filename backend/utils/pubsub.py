@@ -0,0 +1,194 @@
+"""
+Transports that carry WebSocket events between API worker processes.
+
+ConnectionManager delivers every event to its own sockets and hands it
+to a transport, which forwards it to the managers of the other workers.
+LocalPubSub (the default) has no other workers to reach. With several
+uvicorn workers on one host, set PUBSUB_SOCKET (see config.py) to use
+UnixSocketPubSub: the first worker to take the lock file runs a small
+broker on that Unix socket and every worker, itself included, connects
+to it. When the broker's process exits, the remaining workers elect a
+new one and reconnect.
+
+Several workers need STORAGE_BACKEND=sqlite: the JSON collections, their
+id sequences and write-through snapshots live in each process's memory,
+so create_pubsub() refuses to run more than one worker on them.
+"""
+import asyncio
+import os
+
+from config import PUBSUB_SOCKET, STORAGE_BACKEND
+from utils.codec import dumps_bytes, loads
+
+# Largest single event; notifications are far smaller
+MAX_EVENT_SIZE = 1 << 20
+
+
+class LocalPubSub:
+    """Single-process transport: there is nobody else to tell"""
+
+    async def start(self, on_event):
+        pass
+
+    async def publish(self, event):
+        pass
+
+    async def close(self):
+        pass
+
+
+class UnixSocketPubSub:
+    """
+    Forwards events to every other process connected to the broker at
+    ``path``, as newline-delimited JSON.
+
+    Publishing never waits on the network: events are written to the
+    socket's buffer, and dropped while the broker is unreachable or when
+    more than MAX_BUFFER bytes are already waiting. The broker likewise
+    disconnects a worker that stops reading instead of blocking the rest.
+    """
+
+    RECONNECT_DELAY = 0.5
+    MAX_BUFFER = 4 << 20
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._on_event = None
+        self._writer = None
+        self._connected = None
+        self._task = None
+        self._server = None
+        self._lock_file = None
+        self._clients = set()
+
+    async def start(self, on_event):
+        self._on_event = on_event
+        self._connected = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), 5.0)
+        except asyncio.TimeoutError:
+            print(f"Pub/sub broker at {self.path} not reachable yet, retrying in the background")
+
+    async def publish(self, event):
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > self.MAX_BUFFER:
+            print("Pub/sub broker is not keeping up, dropping an event")
+            return
+        writer.write(dumps_bytes(event) + b"\n")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            for client in list(self._clients):
+                client.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        if self._lock_file is not None:
+            # Closing the file releases the flock for the next broker
+            self._lock_file.close()
+            self._lock_file = None
+
+    # -- worker side --
+
+    async def _run(self):
+        while True:
+            try:
+                if self._server is None:
+                    await self._try_become_broker()
+                reader, writer = await asyncio.open_unix_connection(
+                    self.path, limit=MAX_EVENT_SIZE
+                )
+            except OSError:
+                await asyncio.sleep(self.RECONNECT_DELAY)
+                continue
+
+            self._writer = writer
+            self._connected.set()
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    try:
+                        event = loads(line)
+                    except ValueError:
+                        continue
+                    self._on_event(event)
+            except (OSError, ValueError):
+                pass
+            finally:
+                self._writer = None
+                self._connected.clear()
+                writer.close()
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+    # -- broker side --
+
+    async def _try_become_broker(self):
+        import fcntl
+
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # Another worker is the broker
+            lock_file.close()
+            return
+        try:
+            try:
+                # Whoever held the lock before is gone; its socket file is stale
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self._server = await asyncio.start_unix_server(
+                self._serve, path=self.path, limit=MAX_EVENT_SIZE
+            )
+        except BaseException:
+            lock_file.close()
+            raise
+        self._lock_file = lock_file
+
+    async def _serve(self, reader, writer):
+        self._clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for client in list(self._clients):
+                    if client is writer:
+                        continue
+                    if client.transport.get_write_buffer_size() > self.MAX_BUFFER:
+                        # Stuck worker; it reconnects once it reads again
+                        self._clients.discard(client)
+                        client.close()
+                        continue
+                    client.write(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+
+def create_pubsub():
+    """The transport selected by PUBSUB_SOCKET"""
+    if PUBSUB_SOCKET:
+        if STORAGE_BACKEND != "sqlite":
+            raise RuntimeError(
+                "PUBSUB_SOCKET (several workers) requires STORAGE_BACKEND=sqlite; "
+                "the JSON backend keeps its data in each process's memory"
+            )
+        return UnixSocketPubSub(PUBSUB_SOCKET)
+    return LocalPubSub()
@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, deque
+
+
+def normalize_role(job_role):
+    """'  Senior  Backend Developer' -> 'senior backend developer'"""
+    return " ".join(job_role.lower().split())
+
+
+def question_key(question):
+    """Short fingerprint telling whether a question was already asked"""
+    text = " ".join(question.lower().split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+class QuestionPool:
+    """
+    Pre-generated opening questions per normalized job role.
+
+    Questions are produced in the background by ``generate(job_role)`` and
+    kept until they are served or older than ``ttl`` seconds. Only the
+    ``max_roles`` most recently used roles are kept (LRU). Taking a
+    question tops the role back up to ``target_size`` in the background.
+    """
+
+    def __init__(self, generate, target_size=5, max_roles=200, ttl=3600.0):
+        self.generate = generate
+        self.target_size = target_size
+        self.max_roles = max_roles
+        self.ttl = ttl
+        self._questions = OrderedDict()
+        self._refills = {}
+
+    def _bucket(self, role):
+        bucket = self._questions.get(role)
+        if bucket is None:
+            bucket = deque()
+            self._questions[role] = bucket
+            while len(self._questions) > self.max_roles:
+                evicted, _ = self._questions.popitem(last=False)
+                task = self._refills.pop(evicted, None)
+                if task is not None:
+                    task.cancel()
+        else:
+            self._questions.move_to_end(role)
+
+        now = time.monotonic()
+        while bucket and now - bucket[0][1] > self.ttl:
+            bucket.popleft()
+        return bucket
+
+    def size(self, job_role):
+        return len(self._bucket(normalize_role(job_role)))
+
+    def add(self, job_role, question):
+        bucket = self._bucket(normalize_role(job_role))
+        if len(bucket) < self.target_size:
+            bucket.append((question, time.monotonic()))
+
+    def take(self, job_role, skip=frozenset()):
+        """
+        Pop a pooled question for the role (or None) and schedule a refill.
+        Questions whose question_key is in ``skip`` stay pooled for others.
+        """
+        bucket = self._bucket(normalize_role(job_role))
+        question = None
+        for i, (candidate, _) in enumerate(bucket):
+            if question_key(candidate) not in skip:
+                question = candidate
+                del bucket[i]
+                break
+        self.refill(job_role)
+        return question
+
+    def refill(self, job_role):
+        """Top the role's pool up in the background, once at a time per role"""
+        role = normalize_role(job_role)
+        task = self._refills.get(role)
+        if task is not None and not task.done():
+            return
+        self._bucket(role)
+        self._refills[role] = asyncio.get_running_loop().create_task(
+            self._refill(role, job_role)
+        )
+
+    async def _refill(self, role, job_role):
+        try:
+            while role in self._questions and len(self._bucket(role)) < self.target_size:
+                try:
+                    question = await self.generate(job_role)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Leave it for the next take(); don't hammer a failing upstream
+                    print(f"Question pool refill failed for '{role}': {str(e)}")
+                    return
+                self.add(job_role, question)
+        finally:
+            if self._refills.get(role) is asyncio.current_task():
+                del self._refills[role]
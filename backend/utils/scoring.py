@@ -0,0 +1,251 @@
+"""
+Interview scoring.
+
+Answers are scored against the keyword rubrics of the question banks the
+frontend asks from: QUESTION_BANK (the interview page) and
+QUICK_INTERVIEW_BANK (the quick interview on My Applications). They are
+compiled once at import into a lookup by question text, so scoring an
+answer is one dict lookup, one lowercase and a few substring checks. Bump
+RUBRIC_VERSION whenever a bank changes; rescore_interviews() then brings
+every stored interview up to date in a single write.
+"""
+from utils.storage import get_collection
+
+RUBRIC_VERSION = 2
+
+QUESTION_BANK = {
+    "developer": [
+        {
+            "question": "What is the difference between let, const, and var in JavaScript?",
+            "max_score": 10,
+            "expected_keywords": ["scope", "hoisting", "block", "reassign", "function"]
+        },
+        {
+            "question": "Explain the concept of closures in JavaScript with an example.",
+            "max_score": 15,
+            "expected_keywords": ["scope", "function", "lexical", "environment", "memory"]
+        },
+        {
+            "question": "What is the Virtual DOM in React and how does it improve performance?",
+            "max_score": 15,
+            "expected_keywords": ["virtual", "dom", "reconciliation", "diffing", "performance", "batch"]
+        },
+        {
+            "question": "Write a function to reverse a string in JavaScript.",
+            "max_score": 10,
+            "expected_keywords": ["reverse", "string", "split", "join", "algorithm"]
+        },
+        {
+            "question": "Explain RESTful API principles and best practices.",
+            "max_score": 15,
+            "expected_keywords": ["rest", "stateless", "resource", "http", "methods", "status", "codes"]
+        }
+    ],
+    "designer": [
+        {
+            "question": "Explain the difference between UI and UX design.",
+            "max_score": 10,
+            "expected_keywords": ["interface", "experience", "user", "interaction", "visual", "usability"]
+        },
+        {
+            "question": "What tools do you use for prototyping and why?",
+            "max_score": 15,
+            "expected_keywords": ["figma", "sketch", "adobe", "xd", "prototype", "collaboration", "feedback"]
+        },
+        {
+            "question": "What is responsive design and why is it important?",
+            "max_score": 10,
+            "expected_keywords": ["responsive", "mobile", "desktop", "adapt", "layout", "breakpoints"]
+        }
+    ],
+    "manager": [
+        {
+            "question": "How do you handle conflicts between team members?",
+            "max_score": 15,
+            "expected_keywords": ["conflict", "resolution", "communication", "mediation", "understanding", "solution"]
+        },
+        {
+            "question": "Describe your approach to project planning and execution.",
+            "max_score": 20,
+            "expected_keywords": ["agile", "scrum", "planning", "timeline", "resources", "risk", "management"]
+        }
+    ]
+}
+
+# Mirrors getInterviewQuestions() in MyApplications.jsx; questions also in
+# QUESTION_BANK are scored with that entry
+QUICK_INTERVIEW_BANK = {
+    "developer": [
+        {
+            "question": "Explain the difference between let, const, and var in JavaScript.",
+            "max_score": 10,
+            "expected_keywords": ["scope", "hoisting", "block", "reassign"]
+        },
+        {
+            "question": "What is React's virtual DOM and how does it improve performance?",
+            "max_score": 15,
+            "expected_keywords": ["virtual", "dom", "reconciliation", "performance"]
+        },
+        {
+            "question": "Write a function to reverse a string in JavaScript.",
+            "max_score": 10,
+            "expected_keywords": ["reverse", "string", "algorithm"]
+        },
+        {
+            "question": "Explain RESTful API principles and HTTP methods.",
+            "max_score": 15,
+            "expected_keywords": ["rest", "api", "http", "methods"]
+        },
+        {
+            "question": "How would you optimize a slow React component?",
+            "max_score": 20,
+            "expected_keywords": ["optimization", "memo", "performance", "rendering"]
+        },
+        {
+            "question": "What are closures in JavaScript? Provide an example.",
+            "max_score": 15,
+            "expected_keywords": ["closure", "scope", "function", "lexical"]
+        },
+        {
+            "question": "Explain the concept of 'state' in React and how it differs from props.",
+            "max_score": 10,
+            "expected_keywords": ["state", "props", "component", "update"]
+        },
+        {
+            "question": "How does async/await work in JavaScript?",
+            "max_score": 15,
+            "expected_keywords": ["async", "await", "promise", "asynchronous"]
+        }
+    ],
+    "designer": [
+        {
+            "question": "Explain the principles of good UI/UX design.",
+            "max_score": 15,
+            "expected_keywords": ["ui", "ux", "principles", "user-centered"]
+        },
+        {
+            "question": "What tools do you use for prototyping and why?",
+            "max_score": 10,
+            "expected_keywords": ["tools", "prototyping", "figma", "sketch"]
+        }
+    ],
+    "manager": [
+        {
+            "question": "How do you handle conflicts within your team?",
+            "max_score": 15,
+            "expected_keywords": ["conflict", "team", "resolution", "communication"]
+        }
+    ]
+}
+
+# Questions outside the banks (e.g. AI generated ones) only earn the
+# length and structure parts of the score
+DEFAULT_MAX_SCORE = 10
+
+PERFORMANCE_BANDS = [
+    (85, "Excellent", "Outstanding performance! You demonstrate deep understanding of the concepts."),
+    (70, "Good", "Solid performance. You show good understanding with room for improvement in some areas."),
+    (50, "Average", "Decent attempt. Consider reviewing some key concepts and practicing more."),
+    (0, "Needs Improvement", "You may need to strengthen your fundamentals and gain more practical experience.")
+]
+
+
+def _question_key(text):
+    return " ".join((text or "").lower().split())
+
+
+def compile_rubric(question_bank):
+    """{normalized question text: (max_score, lowercased keywords, points per keyword)}"""
+    rubric = {}
+    for questions in question_bank.values():
+        for question in questions:
+            keywords = tuple(dict.fromkeys(k.lower() for k in question["expected_keywords"]))
+            max_score = question["max_score"]
+            per_keyword = max_score * 0.7 / len(keywords) if keywords else 0
+            rubric[_question_key(question["question"])] = (max_score, keywords, per_keyword)
+    return rubric
+
+
+RUBRIC = {**compile_rubric(QUICK_INTERVIEW_BANK), **compile_rubric(QUESTION_BANK)}
+_DEFAULT_RULE = (DEFAULT_MAX_SCORE, (), 0)
+
+
+def score_answer(question, answer, rubric=RUBRIC):
+    """Return (score, max_score) for one answer"""
+    max_score, keywords, per_keyword = rubric.get(_question_key(question), _DEFAULT_RULE)
+    answer = answer or ""
+    if not answer.strip():
+        return 0, max_score
+
+    score = min(max_score * 0.3, len(answer) / 20)
+    answer_lower = answer.lower()
+    for keyword in keywords:
+        if keyword in answer_lower:
+            score += per_keyword
+    if len(answer.split(".")) > 2:
+        score += max_score * 0.1
+    return min(score, max_score), max_score
+
+
+def score_answers(answers, rubric=RUBRIC):
+    """
+    Score an interview's answers ([{"question", "answer", ...}]).
+
+    Returns the fields stored on the interview record plus the feedback
+    text shown to the candidate.
+    """
+    total = 0
+    max_total = 0
+    for item in answers:
+        score, max_score = score_answer(item.get("question"), item.get("answer"), rubric)
+        total += score
+        max_total += max_score
+
+    percentage = round(total / max_total * 100, 2) if max_total else 0.0
+    for threshold, performance, feedback in PERFORMANCE_BANDS:
+        if percentage >= threshold:
+            break
+    return {
+        "score": round(total),
+        "max_score": max_total,
+        "percentage": percentage,
+        "performance": performance,
+        "feedback": feedback,
+        "rubric_version": RUBRIC_VERSION
+    }
+
+
+def rescore_interviews(force=False):
+    """
+    Stage new scores for every interview not scored with the current
+    rubric (all of them with ``force``), and refresh the interview_score
+    of applications whose latest interview changed. Returns the
+    (interview updates, application updates) lists, to be written with
+    update_records().
+    """
+    interview_updates = []
+    latest = {}
+    for interview in get_collection("interviews.json").read():
+        app_id = interview.get("application_id")
+        if force or interview.get("rubric_version") != RUBRIC_VERSION:
+            result = score_answers(interview.get("answers") or [])
+            changes = {
+                "score": result["score"],
+                "max_score": result["max_score"],
+                "percentage": result["percentage"],
+                "performance": result["performance"],
+                "rubric_version": RUBRIC_VERSION
+            }
+            interview_updates.append((interview["id"], changes))
+            interview = dict(interview, **changes)
+        current = latest.get(app_id)
+        if current is None or interview.get("completed_at", "") > current.get("completed_at", ""):
+            latest[app_id] = interview
+
+    rescored = {str(record_id) for record_id, _ in interview_updates}
+    application_updates = [
+        (app_id, {"interview_score": interview["percentage"]})
+        for app_id, interview in latest.items()
+        if app_id is not None and str(interview.get("id")) in rescored
+    ]
+    return interview_updates, application_updates
@@ -0,0 +1,58 @@
+from utils.derived import DerivedIndex
+
+
+def profile_skills(profile):
+    return {skill.lower() for skill in profile.get("skills", [])}
+
+
+class SkillIndex(DerivedIndex):
+    """
+    Inverted index from a lowercased skill to the emails of the candidates
+    whose profile lists it.
+
+    Kept up to date as profiles are saved; sync() rebuilds it when the
+    profiles changed in a way that didn't go through add() (see
+    utils.derived).
+    """
+
+    def __init__(self):
+        self.candidates = {}
+        self._skills = {}
+
+    def __len__(self):
+        return len(self._skills)
+
+    def add(self, profile):
+        email = profile.get("email")
+        if not email:
+            return
+        self.remove(email)
+        skills = profile_skills(profile)
+        for skill in skills:
+            self.candidates.setdefault(skill, {})[email] = None
+        self._skills[email] = skills
+
+    def remove(self, email):
+        for skill in self._skills.pop(email, ()):
+            emails = self.candidates.get(skill)
+            if emails is not None:
+                emails.pop(email, None)
+                if not emails:
+                    del self.candidates[skill]
+
+    def rebuild(self, profiles):
+        self.candidates = {}
+        self._skills = {}
+        for profile in profiles:
+            self.add(profile)
+
+    def match(self, skills):
+        """Emails of the candidates having any of ``skills`` (lowercased)"""
+        matched = {}
+        for skill in skills:
+            matched.update(self.candidates.get(skill, {}))
+        return list(matched)
+
+
+# Shared by the profile and job endpoints in main.py
+skill_index = SkillIndex()
@@ -0,0 +1,641 @@
+"""
+SQLite storage backend.
+
+Each data file becomes a table holding one JSON document per row, with an
+expression index on every field listed in INDEXED_FIELDS, so the lookups
+endpoints do through find()/find_in() run as indexed SQL queries, and a
+unique index on every UNIQUE_FIELDS entry. The
+database runs in WAL mode so readers never wait on the writer. Row counts
+are kept in a ``_counts`` table by triggers, so count() is one lookup, and
+so are the versions behind version() in ``_versions``: one counter per
+table and one per value of each indexed field, bumped by every write from
+any process. The TALLIES behind tallies() live in ``_tallies``, also
+updated by triggers in the transaction that changes the rows.
+
+Select it with STORAGE_BACKEND=sqlite (see config.py). Existing JSON data
+is copied over with:
+
+    python -m utils.sqlite_store migrate [--models models] [--db models/data.db]
+"""
+import argparse
+import os
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from utils.storage import (
+    BaseCollection, Collection, JournalCollection, INDEXED_FIELDS,
+    JOURNALED_FILES, SORTED_INDEXES, TALLIES, UNIQUE_FIELDS, StorageError, _copy
+)
+from utils.codec import dumps, loads
+
+# SQLite's default limit on bound parameters is 32766; stay well below it
+IN_CHUNK = 500
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def table_name(filename):
+    name = os.path.splitext(filename)[0]
+    if not _IDENTIFIER.match(name):
+        raise StorageError(f"Unsupported collection name: {filename}")
+    return name
+
+
+def _field_expr(field, column="data"):
+    if not _IDENTIFIER.match(field):
+        raise StorageError(f"Unsupported field name: {field}")
+    # Must match the indexed expression exactly for SQLite to use the index
+    return f"json_extract({column}, '$.{field}')"
+
+
+def _literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value)
+    raise StorageError(f"Unsupported default for a sorted index: {value!r}")
+
+
+def _bump_version(table, field="", expr="''"):
+    """Trigger statement adding one to a _versions counter"""
+    where = f" WHERE {expr} IS NOT NULL" if field else ""
+    return (
+        "INSERT INTO _versions (name, field, value, version) "
+        f"SELECT '{table}', '{field}', {expr}, 1{where} "
+        "ON CONFLICT (name, field, value) DO UPDATE SET version = version + 1;"
+    )
+
+
+def _tally_parts(spec, column="data"):
+    """SQL for a TALLIES entry's group key, amount and condition"""
+    group_fields, summed, unless = spec
+    columns = [_field_expr(field, column) for field in group_fields]
+    amount = f"COALESCE({_field_expr(summed, column)}, 0)" if summed else "1"
+    conditions = [f"{c} IS NOT NULL" for c in columns]
+    if unless:
+        conditions.append(f"NOT COALESCE({_field_expr(unless, column)}, 0)")
+    return f"json_array({', '.join(columns)})", amount, " AND ".join(conditions) or "1"
+
+
+def _bump_tally(table, name, spec, row, sign):
+    """Trigger statement adding (sign 1) or removing (-1) a row's share of a tally"""
+    key, amount, condition = _tally_parts(spec, f"{row}.data")
+    return (
+        "INSERT INTO _tallies (name, tally, key, value) "
+        f"SELECT '{table}', '{name}', {key}, ({amount}) * {sign} WHERE {condition} "
+        "ON CONFLICT (name, tally, key) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+def _order_expr(field, default):
+    if default is None:
+        return _field_expr(field)
+    return f"COALESCE({_field_expr(field)}, {_literal(default)})"
+
+
+class SQLiteDatabase:
+    """A WAL-mode database file with a small pool of connections"""
+
+    def __init__(self, path, pool_size=4):
+        self.path = path
+        self._pool = queue.LifoQueue()
+        self._pool_size = pool_size
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self._tables = set()
+        with self.connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _sequences ("
+                "name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _counts ("
+                "name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _versions ("
+                "name TEXT NOT NULL, field TEXT NOT NULL, value NOT NULL, "
+                "version INTEGER NOT NULL, PRIMARY KEY (name, field, value))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _tallies ("
+                "name TEXT NOT NULL, tally TEXT NOT NULL, key TEXT NOT NULL, "
+                "value NOT NULL, PRIMARY KEY (name, tally, key))"
+            )
+            # The definition each tally was last computed with
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _tally_specs ("
+                "name TEXT NOT NULL, tally TEXT NOT NULL, spec TEXT NOT NULL, "
+                "PRIMARY KEY (name, tally))"
+            )
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path, timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection from the pool"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._create_lock:
+                can_create = self._created < self._pool_size
+                if can_create:
+                    self._created += 1
+            conn = self._connect() if can_create else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection and run the block in one write transaction"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def ensure_table(self, table, indexed_fields=(), sorted_indexes=None, unique_fields=(),
+                     tallies=None):
+        if table in self._tables:
+            return
+        with self.transaction() as conn:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                "pos INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "id TEXT, "
+                "data TEXT NOT NULL)"
+            )
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}_id" ON "{table}" (id)')
+            for field in indexed_fields:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{table}_{field}" '
+                    f'ON "{table}" ({_field_expr(field)})'
+                )
+            for fields in unique_fields:
+                try:
+                    conn.execute(
+                        f'CREATE UNIQUE INDEX IF NOT EXISTS "uniq_{table}_{"_".join(fields)}" '
+                        f'ON "{table}" ({", ".join(_field_expr(f) for f in fields)})'
+                    )
+                except sqlite3.IntegrityError:
+                    # Rows stored before the index existed already repeat
+                    # these values; serve them and enforce nothing.
+                    print(f"Warning: duplicate {', '.join(fields)} values in {table}; not enforced")
+            for (group_field, order_field), (default, descending) in (sorted_indexes or {}).items():
+                if order_field is None:
+                    # Insertion order is pos, which every index already ends with
+                    continue
+                columns = [_order_expr(order_field, default) + (" DESC" if descending else "")]
+                if group_field is not None:
+                    columns.insert(0, _field_expr(group_field))
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{table}_{group_field}_by_{order_field}" '
+                    f'ON "{table}" ({", ".join(columns)})'
+                )
+            # Tables created before the triggers existed start from a real count
+            conn.execute(
+                f'INSERT OR IGNORE INTO _counts (name, value) SELECT ?, COUNT(*) FROM "{table}"',
+                (table,)
+            )
+            for event, delta in (("INSERT", "+ 1"), ("DELETE", "- 1")):
+                conn.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS "{table}_count_{event.lower()}" '
+                    f'AFTER {event} ON "{table}" BEGIN '
+                    f"UPDATE _counts SET value = value {delta} WHERE name = '{table}'; END"
+                )
+            for name, spec in (tallies or {}).items():
+                stored = conn.execute(
+                    "SELECT spec FROM _tally_specs WHERE name = ? AND tally = ?", (table, name)
+                ).fetchone()
+                if stored is not None and stored[0] == repr(spec):
+                    continue
+                # New or redefined: start from the rows already stored
+                key, amount, condition = _tally_parts(spec)
+                conn.execute("DELETE FROM _tallies WHERE name = ? AND tally = ?", (table, name))
+                conn.execute(
+                    "INSERT INTO _tallies (name, tally, key, value) "
+                    f'SELECT ?, ?, {key}, SUM({amount}) FROM "{table}" WHERE {condition} GROUP BY 3',
+                    (table, name)
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO _tally_specs (name, tally, spec) VALUES (?, ?, ?)",
+                    (table, name, repr(spec))
+                )
+            # Recreated every time since they depend on the indexed fields
+            # and the tallies
+            for event, rows in (("INSERT", ("NEW",)), ("UPDATE", ("OLD", "NEW")), ("DELETE", ("OLD",))):
+                statements = [_bump_version(table)]
+                for field in indexed_fields:
+                    for row in rows:
+                        statements.append(_bump_version(table, field, _field_expr(field, f"{row}.data")))
+                for name, spec in (tallies or {}).items():
+                    for row in rows:
+                        statements.append(_bump_tally(table, name, spec, row, -1 if row == "OLD" else 1))
+                conn.execute(f'DROP TRIGGER IF EXISTS "{table}_version_{event.lower()}"')
+                conn.execute(
+                    f'CREATE TRIGGER "{table}_version_{event.lower()}" '
+                    f'AFTER {event} ON "{table}" BEGIN {" ".join(statements)} END'
+                )
+        self._tables.add(table)
+
+    def next_id(self, table):
+        """Atomically issue the next id for a table, across processes"""
+        with self.connection() as conn:
+            row = conn.execute(
+                "UPDATE _sequences SET value = value + 1 WHERE name = ? RETURNING value",
+                (table,)
+            ).fetchone()
+            if row is None:
+                # First id for this table: start after the highest one in it
+                conn.execute(
+                    "INSERT OR IGNORE INTO _sequences (name, value) "
+                    f'SELECT ?, COALESCE(MAX(CAST(id AS INTEGER)), 0) FROM "{table}"',
+                    (table,)
+                )
+                row = conn.execute(
+                    "UPDATE _sequences SET value = value + 1 WHERE name = ? RETURNING value",
+                    (table,)
+                ).fetchone()
+        return str(row[0])
+
+    def reset_sequences(self):
+        with self.connection() as conn:
+            conn.execute("DELETE FROM _sequences")
+
+
+class SQLiteCollection(BaseCollection):
+    """
+    A collection stored as rows of one SQLite table.
+
+    Reads go straight to the database, so they always see what every
+    process has committed. Mutations are staged as statements and the
+    batch collected by commit() is applied in a single transaction; an
+    insert that would repeat UNIQUE_FIELDS values is dropped on its own
+    (see rejected()) rather than failing the batch.
+    refresh() bumps ``generation`` when the table's version moved because
+    of another process's writes, so derived structures rebuild.
+    """
+
+    def __init__(self, filename, database, indexed_fields=(), sorted_indexes=None, unique_fields=(),
+                 tallies=None):
+        super().__init__(filename)
+        self.database = database
+        self.path = database.path
+        self.table = table_name(filename)
+        self._indexed_fields = tuple(indexed_fields)
+        self._sort_specs = dict(sorted_indexes or {})
+        self._unique_fields = tuple(tuple(fields) for fields in unique_fields)
+        self._tally_specs = dict(tallies or {})
+        self._pending = []
+        # Unique keys of the inserts the writer dropped as duplicates,
+        # until rejected() reports them
+        self._rejected = set()
+        # Table version as of the last refresh() or flush, to tell other
+        # processes' writes from this one's
+        self._seen_version = None
+        database.ensure_table(
+            self.table, self._indexed_fields, self._sort_specs, self._unique_fields,
+            self._tally_specs
+        )
+
+    def _select(self, where="", params=()):
+        with self.database.connection() as conn:
+            rows = conn.execute(
+                f'SELECT data FROM "{self.table}" {where} ORDER BY pos', params
+            ).fetchall()
+        return [loads(row[0]) for row in rows]
+
+    def refresh(self):
+        """Bump ``generation`` if another process changed the table"""
+        version = self.version()
+        if self._seen_version is not None and version != self._seen_version:
+            self.generation += 1
+        self._seen_version = version
+
+    def _table_version(self, conn):
+        row = conn.execute(
+            "SELECT version FROM _versions WHERE name = ? AND field = '' AND value = ''",
+            (self.table,)
+        ).fetchone()
+        return str(row[0]) if row else "0"
+
+    def read(self):
+        return self._select()
+
+    def get(self, record_id):
+        rows = self._select("WHERE id = ?", (str(record_id),))
+        return rows[0] if rows else None
+
+    def find(self, field, value):
+        if field == "id":
+            record = self.get(value)
+            return [record] if record is not None else []
+        return self._select(f"WHERE {_field_expr(field)} = ?", (value,))
+
+    def find_in(self, field, values):
+        if field == "id":
+            values = [str(v) for v in values]
+        values = list(dict.fromkeys(values))
+        column = "id" if field == "id" else _field_expr(field)
+        matches = []
+        for start in range(0, len(values), IN_CHUNK):
+            chunk = values[start:start + IN_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            matches.extend(self._select(f"WHERE {column} IN ({placeholders})", chunk))
+        return matches
+
+    def count(self):
+        with self.database.connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM _counts WHERE name = ?", (self.table,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def tallies(self, name, groups):
+        if name not in self._tally_specs:
+            raise StorageError(f"No tally {name} in {self.filename}")
+        groups = list(dict.fromkeys(map(tuple, groups)))
+        totals = {}
+        with self.database.connection() as conn:
+            for start in range(0, len(groups), IN_CHUNK):
+                chunk = groups[start:start + IN_CHUNK]
+                keys = ", ".join(
+                    f"json_array({', '.join('?' for _ in group)})" for group in chunk
+                )
+                rows = conn.execute(
+                    "SELECT key, value FROM _tallies WHERE name = ? AND tally = ? "
+                    f"AND key IN ({keys}) AND value != 0",
+                    [self.table, name] + [value for group in chunk for value in group]
+                ).fetchall()
+                totals.update((tuple(loads(key)), value) for key, value in rows)
+        return totals
+
+    def version(self, field=None, value=None):
+        if field is not None and field not in self._indexed_fields:
+            raise StorageError(f"No index on {field} in {self.filename}")
+        with self.database.connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM _versions WHERE name = ? AND field = ? AND value = ?",
+                (self.table, field or "", value if field is not None else "")
+            ).fetchone()
+        return str(row[0]) if row else "0"
+
+    def page(self, field, value, order_by=None, limit=20, after=None):
+        spec = (field, order_by)
+        if spec not in self._sort_specs:
+            raise StorageError(f"No sorted index on {spec} in {self.filename}")
+        default, descending = self._sort_specs[spec]
+
+        # Keys are (order value, pos), pos negated for descending orders,
+        # the same shape as the JSON collections' keys
+        where, params = [], []
+        if field is not None:
+            where.append(f"{_field_expr(field)} = ?")
+            params.append(value)
+        if order_by is None:
+            order = "pos"
+            if after is not None:
+                where.append("pos > ?")
+                params.append(self._page_pos(after, descending))
+        else:
+            expr = _order_expr(order_by, default)
+            order = f"{expr} DESC, pos" if descending else f"{expr}, pos"
+            if after is not None:
+                try:
+                    after_value = after[0]
+                except (TypeError, IndexError, KeyError):
+                    raise ValueError("Invalid page key")
+                if not isinstance(after_value, (str, int, float)) or isinstance(after_value, bool):
+                    raise ValueError("Invalid page key")
+                where.append(f"({expr} {'<' if descending else '>'} ? OR ({expr} = ? AND pos > ?))")
+                params += [after_value, after_value, self._page_pos(after, descending)]
+
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        with self.database.connection() as conn:
+            rows = conn.execute(
+                f'SELECT data, pos FROM "{self.table}" {clause} ORDER BY {order} LIMIT ?',
+                params + [limit + 1]
+            ).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        records = [loads(data) for data, _ in rows]
+        if not more or not rows:
+            return records, None
+        last = records[-1]
+        pos = rows[-1][1]
+        if order_by is None:
+            return records, [None, -pos if descending else pos]
+        last_value = last.get(order_by) if isinstance(last, dict) else None
+        if last_value is None:
+            last_value = default
+        return records, [last_value, -pos if descending else pos]
+
+    @staticmethod
+    def _page_pos(after, descending):
+        try:
+            pos = int(after[1])
+        except (TypeError, ValueError, IndexError, KeyError):
+            raise ValueError("Invalid page key")
+        return -pos if descending else pos
+
+    def next_id(self):
+        return self.database.next_id(self.table)
+
+    def write(self, data):
+        self.generation += 1
+        self._pending.append(("replace", [_copy(r) for r in data]))
+
+    def insert(self, record):
+        self._pending.append(("insert", _copy(record)))
+
+    def update_many(self, updates):
+        updates = [(str(record_id), changes) for record_id, changes in updates]
+        existing = {r.get("id") for r in self.find_in("id", [u[0] for u in updates])}
+        found = [(record_id, changes) for record_id, changes in updates if record_id in existing]
+        if found:
+            self._pending.append(("update", found))
+        return len(found)
+
+    def upsert(self, field, record, defaults=None):
+        # Looked up inside the write transaction, so two processes saving
+        # the same key can't both insert it. The name is checked here
+        # rather than failing the writer's whole batch.
+        _field_expr(field)
+        self._pending.append(("upsert", (field, _copy(record), dict(defaults or {}))))
+
+    def _unique_keys(self, record):
+        if not isinstance(record, dict):
+            return []
+        return [(fields, tuple(record.get(f) for f in fields)) for fields in self._unique_fields]
+
+    def rejected(self, record):
+        keys = [key for key in self._unique_keys(record) if key in self._rejected]
+        self._rejected.difference_update(keys)
+        return bool(keys)
+
+    def delete_many(self, record_ids):
+        record_ids = list(dict.fromkeys(str(record_id) for record_id in record_ids))
+        existing = [str(r.get("id")) for r in self.find_in("id", record_ids)]
+        if existing:
+            self._pending.append(("delete", existing))
+        return len(existing)
+
+    def _prepare_flush(self):
+        if not self._pending:
+            return None
+        ops, self._pending = self._pending, []
+        return ops
+
+    def _insert_row(self, conn, record):
+        """Insert ``record``; False if a unique index already has its values"""
+        record_id = record.get("id") if isinstance(record, dict) else None
+        cursor = conn.execute(
+            f'INSERT {"OR IGNORE " if self._unique_fields else ""}INTO "{self.table}" (id, data) '
+            "VALUES (?, ?)",
+            (str(record_id) if record_id is not None else None, dumps(record))
+        )
+        return cursor.rowcount > 0
+
+    def _flush(self, ops):
+        rejected = []
+        with self.database.transaction() as conn:
+            if self._seen_version is not None and self._table_version(conn) != self._seen_version:
+                # Another process wrote since the last refresh()
+                self.generation += 1
+            for op, arg in ops:
+                if op == "replace":
+                    conn.execute(f'DELETE FROM "{self.table}"')
+                    for record in arg:
+                        self._insert_row(conn, record)
+                elif op == "insert":
+                    if not self._insert_row(conn, arg):
+                        rejected.extend(self._unique_keys(arg))
+                elif op == "upsert":
+                    field, record, defaults = arg
+                    row = conn.execute(
+                        f'SELECT pos, data FROM "{self.table}" WHERE {_field_expr(field)} = ? '
+                        "ORDER BY pos LIMIT 1",
+                        (record.get(field),)
+                    ).fetchone()
+                    if row is None:
+                        self._insert_row(conn, {**defaults, **record})
+                    else:
+                        stored = loads(row[1])
+                        stored.update((k, v) for k, v in record.items() if k != "id")
+                        conn.execute(
+                            f'UPDATE OR IGNORE "{self.table}" SET data = ? WHERE pos = ?',
+                            (dumps(stored), row[0])
+                        )
+                elif op == "update":
+                    for record_id, changes in arg:
+                        row = conn.execute(
+                            f'SELECT data FROM "{self.table}" WHERE id = ?', (record_id,)
+                        ).fetchone()
+                        if row is None:
+                            continue
+                        record = loads(row[0])
+                        record.update(changes)
+                        conn.execute(
+                            f'UPDATE "{self.table}" SET data = ? WHERE id = ?',
+                            (dumps(record), record_id)
+                        )
+                elif op == "delete":
+                    for start in range(0, len(arg), IN_CHUNK):
+                        chunk = arg[start:start + IN_CHUNK]
+                        placeholders = ", ".join("?" for _ in chunk)
+                        conn.execute(
+                            f'DELETE FROM "{self.table}" WHERE id IN ({placeholders})', chunk
+                        )
+            self._seen_version = self._table_version(conn)
+        self._rejected.update(rejected)
+
+    def _discard_staged(self):
+        self._pending = []
+
+
+def migrate(models_folder, db_path):
+    """
+    Copy every JSON collection in ``models_folder`` into ``db_path``,
+    including the background tasks still pending in _tasks.json
+    """
+    database = SQLiteDatabase(db_path)
+    sequences_path = os.path.join(models_folder, "_sequences.json")
+    sequences = {}
+    if os.path.exists(sequences_path):
+        with open(sequences_path, "rb") as f:
+            sequences = loads(f.read())
+
+    # Journaled collections may not have a snapshot yet, only a journal
+    filenames = set()
+    for name in os.listdir(models_folder):
+        stem, ext = os.path.splitext(name)
+        if ext == ".json" or (ext == ".journal" and stem + ".json" in JOURNALED_FILES):
+            filenames.add(stem + ".json")
+
+    migrated = {}
+    for filename in sorted(filenames):
+        if filename.startswith("_") and filename not in JOURNALED_FILES:
+            # _sequences.json and the like: not collections. Journaled ones
+            # such as the background task queue's pending tasks are.
+            continue
+        indexed_fields = INDEXED_FIELDS.get(filename, ())
+        if filename in JOURNALED_FILES:
+            source = JournalCollection(filename, models_folder, indexed_fields)
+        else:
+            source = Collection(filename, models_folder, indexed_fields)
+        records = source.read()
+
+        target = SQLiteCollection(
+            filename, database, indexed_fields, SORTED_INDEXES.get(filename, {}),
+            UNIQUE_FIELDS.get(filename, ()), TALLIES.get(filename, {})
+        )
+        target.write(records)
+        target.flush_now()
+        skipped = len(records) - target.count()
+        if skipped:
+            print(f"{filename}: skipped {skipped} records repeating unique values")
+
+        last_id = max(sequences.get(filename, 0), source.max_id)
+        with database.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO _sequences (name, value) VALUES (?, ?)",
+                (target.table, last_id)
+            )
+        migrated[filename] = len(records)
+    return migrated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite storage tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="copy a models/ directory of JSON files into SQLite"
+    )
+    migrate_parser.add_argument("--models", default="models")
+    migrate_parser.add_argument("--db", default=os.path.join("models", "data.db"))
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        migrated = migrate(args.models, args.db)
+        for filename, count in migrated.items():
+            print(f"{filename}: {count} records")
+        print(f"Migrated {len(migrated)} collections into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1201 @@
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import tempfile
+import threading
+from config import STORAGE_BACKEND, SQLITE_PATH
+from utils.codec import dumps_bytes, loads
+
+DATA_FOLDER = "models"
+
+# Collections that grow one record at a time and are stored as a snapshot
+# plus an append-only journal instead of being rewritten on every insert.
+JOURNALED_FILES = {
+    "notifications.json", "interviews.json", "interview_sessions.json", "_tasks.json"
+}
+
+# Secondary hash indexes kept per collection (records are always indexed
+# by "id" as well). Joins in main.py look records up through these.
+INDEXED_FIELDS = {
+    "candidate.json": ["email"],
+    "company.json": ["email"],
+    "profiles.json": ["email"],
+    "jobs.json": ["company_email"],
+    "applications.json": ["job_id", "candidate_email"],
+    "interviews.json": ["application_id", "candidate_email", "job_id"],
+    "notifications.json": ["user_email"],
+    "interview_sessions.json": ["application_id"],
+}
+
+# Fields (or groups of fields) whose values may appear on one record
+# only. Endpoints check them under the collection's lock; the SQLite
+# backend also enforces them with unique indexes, which hold across worker
+# processes (see BaseCollection.rejected).
+UNIQUE_FIELDS = {
+    "candidate.json": [("email",)],
+    "company.json": [("email",)],
+    "profiles.json": [("email",)],
+    "applications.json": [("job_id", "candidate_email")],
+}
+
+# Running totals per group of records, kept up to date with every write so
+# reading one is a lookup: collection -> name -> (group fields, field to
+# sum or None to count records, field whose truthy records are left out
+# or None). Records with a group field missing aren't counted. The SQLite
+# backend keeps them in its _tallies table with triggers, so they include
+# every process's writes.
+TALLIES = {
+    "notifications.json": {"unread": (("user_email",), None, "read")},
+    # Behind utils.analytics
+    "jobs.json": {
+        "by_company": (("company_email",), None, None),
+        "by_company_status": (("company_email", "status"), None, None),
+    },
+    "applications.json": {
+        "by_candidate": (("candidate_email",), None, None),
+        "by_candidate_status": (("candidate_email", "status"), None, None),
+        "by_job": (("job_id",), None, None),
+        "by_job_status": (("job_id", "status"), None, None),
+    },
+    "interviews.json": {
+        "by_candidate": (("candidate_email",), None, None),
+        "by_job": (("job_id",), None, None),
+        "score_by_job": (("job_id",), "percentage", None),
+    },
+}
+
+# Orders that list endpoints read a page at a time through page():
+# (group field, order field) -> (value used when the order field is
+# missing, descending). A group field of None covers the whole collection
+# and an order field of None means insertion order. Ties always keep
+# insertion order (id order in the JSON collections, ids being issued in
+# insertion order).
+SORTED_INDEXES = {
+    "jobs.json": {(None, None): (None, False)},
+    "applications.json": {
+        ("job_id", None): (None, False),
+        ("job_id", "applied_date"): ("", True),
+        ("candidate_email", "applied_date"): ("", True),
+    },
+    "notifications.json": {("user_email", "created_at"): ("", True)},
+    "interviews.json": {("job_id", "percentage"): (0, True)},
+}
+
+
+# Part of every version() token of the JSON collections: their counters
+# live in memory, so two worker processes (or two runs) can reach the same
+# numbers with different data.
+_PROCESS_TOKEN = os.urandom(6).hex()
+
+
+class StorageError(Exception):
+    """A data file could not be read or written"""
+
+
+class DuplicateError(StorageError):
+    """Another record already has the new record's UNIQUE_FIELDS values"""
+
+
+def _copy(record):
+    return dict(record) if isinstance(record, dict) else record
+
+
+def _indexable(value):
+    return value is not None and not isinstance(value, (list, dict))
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+
+
+def _numeric_id(record):
+    try:
+        return int(record.get("id", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+def _fsync_dir(path):
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, payload):
+    """
+    Replace ``path`` with ``payload`` so readers see the old or the new
+    content, never a truncated file: write a temp file, fsync, rename.
+    """
+    # A unique temp name per call: several threads (and processes) may
+    # replace the same file at once.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".",
+        prefix=os.path.basename(path) + ".",
+        suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb" if isinstance(payload, bytes) else "w") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(path)
+
+
+class SequenceStore:
+    """
+    Last issued id per collection, persisted in ``_sequences.json``.
+
+    Ids are handed out from memory in O(1). Each collection's writer
+    persists the sequence file before the records that use the new ids,
+    so an id on disk is never issued again - not even after the record
+    holding it is deleted and the process restarts.
+    """
+
+    def __init__(self, data_folder=DATA_FOLDER):
+        self.path = os.path.join(data_folder, "_sequences.json")
+        self._values = None
+        self._dirty = False
+        # Every collection's writer thread flushes this one file. _lock
+        # guards the counters; _flush_lock lets one thread write at a time.
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "rb") as f:
+                content = f.read().strip()
+            return loads(content) if content else {}
+        except (OSError, json.JSONDecodeError) as e:
+            raise StorageError(f"Error reading sequences {self.path}: {str(e)}")
+
+    def next_id(self, collection):
+        with self._lock:
+            if self._values is None:
+                self._values = self._load()
+            # Records added by hand (or by another process) may already use
+            # ids past the stored counter.
+            value = max(self._values.get(collection.filename, 0), collection.max_id) + 1
+            self._values[collection.filename] = value
+            self._dirty = True
+        return str(value)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+            self._dirty = True
+
+    def flush(self):
+        """
+        Persist the latest counters if any changed since the last write.
+
+        Always writes the current values rather than a snapshot taken when
+        a batch was staged, so a slow flush can never overwrite a newer
+        one. A thread that finds nothing dirty returns only after any
+        write in progress finished, so the ids it is about to store are
+        durable either way.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                payload = dumps_bytes(self._values)
+                self._dirty = False
+            try:
+                atomic_write(self.path, payload)
+            except BaseException:
+                # Over-issuing ids is harmless, so a failed write just
+                # keeps the in-memory counters for the next flush.
+                with self._lock:
+                    self._dirty = True
+                raise
+
+
+class BaseCollection:
+    """
+    Storage interface shared by every backend.
+
+    Reads (read/get/find/find_in/find_one) return copies that callers may
+    decorate freely. Mutations (write/insert/update_many/delete_many) take
+    effect immediately for readers in this process and are staged for the
+    backend; ``await commit()`` waits until they are durable. A single
+    writer task per collection collects every commit requested within
+    COMMIT_WINDOW and persists them as one batch.
+
+    Subclasses implement the reads, the mutations and the three flush
+    hooks: _prepare_flush (on the event loop), _flush (in a worker thread)
+    and _after_flush (back on the event loop).
+    """
+
+    COMMIT_WINDOW = 0.005
+
+    def __init__(self, filename):
+        self.filename = filename
+        # Held by endpoints around check-then-write sequences (uniqueness
+        # checks, upserts) so two requests can't interleave them.
+        self.lock = asyncio.Lock()
+        self._flushing = False
+        self._waiters = []
+        self._writer = None
+        # Bumped whenever the records change other than through this
+        # process's own inserts, updates and deletes: replaced wholesale
+        # (write() or a reload from disk) or, with SQLite, written by
+        # another process. Structures derived from them (utils.derived)
+        # then rebuild instead of applying deltas.
+        self.generation = 0
+
+    def refresh(self):
+        """Pick up changes made outside this process"""
+
+    def read(self):
+        raise NotImplementedError
+
+    def get(self, record_id):
+        raise NotImplementedError
+
+    def find(self, field, value):
+        raise NotImplementedError
+
+    def find_in(self, field, values):
+        """Return copies of the records whose ``field`` is one of ``values``"""
+        matches = []
+        for value in dict.fromkeys(values):
+            matches.extend(self.find(field, value))
+        return matches
+
+    def find_one(self, field, value):
+        """Return a copy of the first record whose ``field`` equals ``value``"""
+        matches = self.find(field, value)
+        return matches[0] if matches else None
+
+    def count(self):
+        """Number of records, without reading them"""
+        raise NotImplementedError
+
+    def tallies(self, name, groups):
+        """
+        Values of the TALLIES entry ``name`` for ``groups``, tuples with
+        one value per group field: {group: value}, leaving out the groups
+        whose value is 0.
+        """
+        raise NotImplementedError
+
+    def tally(self, name, *group):
+        """Value of the TALLIES entry ``name`` for one group"""
+        return self.tallies(name, [group]).get(group, 0)
+
+    def version(self, field=None, value=None):
+        """
+        Opaque token that changes whenever the records change, or with
+        ``field`` (an indexed field) whenever a record whose ``field``
+        equals ``value`` is added, changed or removed. Unchanged data
+        keeps its token, so it can serve as an HTTP validator.
+        """
+        raise NotImplementedError
+
+    def page(self, field, value, order_by=None, limit=20, after=None):
+        """
+        Return up to ``limit`` copies of the records whose ``field`` equals
+        ``value`` (all records if ``field`` is None), in the order of the
+        SORTED_INDEXES entry for (field, order_by), and the key to pass as
+        ``after`` for the next page (None on the last page). Raises
+        ValueError for a key that didn't come from this collection.
+        """
+        raise NotImplementedError
+
+    def next_id(self):
+        raise NotImplementedError
+
+    def write(self, data):
+        raise NotImplementedError
+
+    def insert(self, record):
+        raise NotImplementedError
+
+    def update_many(self, updates):
+        raise NotImplementedError
+
+    def upsert(self, field, record, defaults=None):
+        raise NotImplementedError
+
+    def rejected(self, record):
+        """
+        True if the insert of ``record`` was dropped when it was committed
+        because another process had already stored a record with the same
+        UNIQUE_FIELDS values. Only backends shared between processes can
+        drop inserts; checked once per insert, after commit().
+        """
+        return False
+
+    def delete_many(self, record_ids):
+        raise NotImplementedError
+
+    def _prepare_flush(self):
+        raise NotImplementedError
+
+    def _flush(self, payload):
+        raise NotImplementedError
+
+    def _after_flush(self, payload):
+        pass
+
+    def _discard_staged(self):
+        pass
+
+    def flush_now(self):
+        """Synchronously persist anything staged (scripts and shutdown)"""
+        payload = self._prepare_flush()
+        if payload is not None:
+            self._flush(payload)
+            self._after_flush(payload)
+
+    async def commit(self):
+        """
+        Wait until every mutation staged so far is durable.
+
+        Returns True on success and False if the write failed.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._write_loop())
+        try:
+            await waiter
+            return True
+        except Exception as e:
+            print(f"Error writing {self.filename}: {str(e)}")
+            return False
+
+    async def _write_loop(self):
+        while self._waiters:
+            # Let other requests stage their changes into the same batch
+            await asyncio.sleep(self.COMMIT_WINDOW)
+            waiters, self._waiters = self._waiters, []
+            try:
+                payload = self._prepare_flush()
+                if payload is not None:
+                    self._flushing = True
+                    try:
+                        await asyncio.to_thread(self._flush, payload)
+                    finally:
+                        self._flushing = False
+                    self._after_flush(payload)
+            except Exception as e:
+                # Whatever was staged meanwhile was built on top of the
+                # failed batch, so it fails with it.
+                waiters += self._waiters
+                self._waiters = []
+                self._discard_staged()
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+
+class Collection(BaseCollection):
+    """
+    One JSON data file kept in memory.
+
+    The file is parsed once and served from memory afterwards. Every read
+    checks the file's mtime/size so edits made outside the API (or by
+    another process) are picked up. A batch of commits is persisted with
+    one atomic replace, so a burst of writers costs one fsync instead of
+    one full rewrite each.
+    """
+
+    def __init__(self, filename, data_folder=DATA_FOLDER, indexed_fields=()):
+        super().__init__(filename)
+        self.path = os.path.join(data_folder, filename)
+        self.records = []
+        self._by_id = {}
+        self._indexes = {field: {} for field in indexed_fields}
+        self._sort_specs = SORTED_INDEXES.get(filename, {})
+        # (group field, order field) -> group value -> sorted keys; a key
+        # is (order value, *tie), tie negated for descending orders so
+        # ties still come out oldest first. A record's tie is (numeric id,
+        # 0), or (0, insertion seq) if it has no id or shares its numeric
+        # id. Keys double as page cursors, so they must survive a reload,
+        # which renumbers seqs but keeps ids.
+        self._sorted = {spec: {} for spec in self._sort_specs}
+        self._tie_of = {}
+        self._by_tie = {}
+        self._next_seq = 0
+        self._tally_specs = TALLIES.get(filename, {})
+        self._tallies = {name: {} for name in self._tally_specs}
+        # Bumped by every mutation; (indexed field, value) -> the version
+        # at the last mutation of a record with that value
+        self._version = 0
+        self._slice_versions = {}
+        self.max_id = 0
+        self._stamp = None
+        self._loaded = False
+        self._dirty = False
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return []
+
+        try:
+            with open(self.path, "rb") as f:
+                content = f.read().strip()
+        except Exception as e:
+            raise StorageError(f"Error reading file {self.path}: {str(e)}")
+
+        if not content:
+            return []
+        try:
+            data = loads(content)
+        except json.JSONDecodeError as e:
+            # Never paper over a damaged file with [] - the next write
+            # would make the data loss permanent.
+            raise StorageError(f"Error decoding JSON from {self.path}: {str(e)}")
+        if isinstance(data, list):
+            return data
+        else:
+            return [data]
+
+    def _set_records(self, records):
+        self.generation += 1
+        self.records = records
+        self._by_id = {
+            r["id"]: r for r in records if isinstance(r, dict) and "id" in r
+        }
+        self.max_id = max((_numeric_id(r) for r in self._by_id.values()), default=0)
+        for field in self._indexes:
+            self._indexes[field] = {}
+        for spec in self._sorted:
+            self._sorted[spec] = {}
+        self._tie_of = {}
+        self._by_tie = {}
+        self._next_seq = 0
+        self._slice_versions = {}
+        for name in self._tallies:
+            self._tallies[name] = {}
+        for record in records:
+            self._index_add(record)
+
+    def _touch(self, record):
+        self._version += 1
+        if not isinstance(record, dict):
+            return
+        for field in self._indexes:
+            value = record.get(field)
+            if _indexable(value):
+                self._slice_versions[(field, value)] = self._version
+
+    def _tally(self, record, sign):
+        for name, (group_fields, summed, unless) in self._tally_specs.items():
+            if unless and record.get(unless):
+                continue
+            group = tuple(record.get(field) for field in group_fields)
+            if not all(_indexable(value) for value in group):
+                continue
+            totals = self._tallies[name]
+            value = totals.get(group, 0) + sign * (_number(record.get(summed)) if summed else 1)
+            if value:
+                totals[group] = value
+            else:
+                totals.pop(group, None)
+
+    def _index_add(self, record):
+        if not isinstance(record, dict):
+            return
+        for field, index in self._indexes.items():
+            value = record.get(field)
+            if _indexable(value):
+                index.setdefault(value, []).append(record)
+        self._tally(record, 1)
+        if self._sorted:
+            tie = (_numeric_id(record), 0)
+            if not tie[0] or tie in self._by_tie:
+                tie = (0, self._next_seq)
+            self._next_seq += 1
+            self._tie_of[id(record)] = tie
+            self._by_tie[tie] = record
+            for spec in self._sorted:
+                self._sorted_add(record, spec, tie)
+
+    def _sort_key(self, record, spec, tie):
+        order_field = spec[1]
+        default, descending = self._sort_specs[spec]
+        value = record.get(order_field) if order_field else None
+        if value is None:
+            value = default
+        return (value, -tie[0], -tie[1]) if descending else (value, *tie)
+
+    def _sorted_bucket(self, record, spec, create=False):
+        group_field = spec[0]
+        group = record.get(group_field) if group_field else None
+        if group_field and not _indexable(group):
+            return None
+        if create:
+            return self._sorted[spec].setdefault(group, [])
+        return self._sorted[spec].get(group)
+
+    def _sorted_add(self, record, spec, tie):
+        keys = self._sorted_bucket(record, spec, create=True)
+        if keys is not None:
+            bisect.insort(keys, self._sort_key(record, spec, tie))
+
+    def _sorted_remove(self, record, spec, tie):
+        keys = self._sorted_bucket(record, spec)
+        if keys is None:
+            return
+        key = self._sort_key(record, spec, tie)
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+        if not keys:
+            group_field = spec[0]
+            del self._sorted[spec][record.get(group_field) if group_field else None]
+
+    def _index_remove(self, record, fields=None):
+        if not isinstance(record, dict):
+            return
+        if fields is None:
+            self._tally(record, -1)
+        if fields is None and self._sorted:
+            tie = self._tie_of.pop(id(record), None)
+            if tie is not None:
+                del self._by_tie[tie]
+                for spec in self._sorted:
+                    self._sorted_remove(record, spec, tie)
+        for field in fields or self._indexes:
+            value = record.get(field)
+            if not _indexable(value):
+                continue
+            bucket = self._indexes[field].get(value)
+            if bucket is None:
+                continue
+            for i, candidate in enumerate(bucket):
+                if candidate is record:
+                    del bucket[i]
+                    break
+            if not bucket:
+                del self._indexes[field][value]
+
+    def _apply_changes(self, record, changes):
+        self._touch(record)
+        self._tally(record, -1)
+        moved = [f for f in self._indexes if f in changes and changes[f] != record.get(f)]
+        if moved:
+            self._index_remove(record, moved)
+        tie = self._tie_of.get(id(record))
+        resorted = [
+            spec for spec in self._sorted
+            if tie is not None and any(f in changes and changes[f] != record.get(f) for f in spec if f)
+        ]
+        for spec in resorted:
+            self._sorted_remove(record, spec, tie)
+        record.update(changes)
+        for field in moved:
+            value = record.get(field)
+            if _indexable(value):
+                self._indexes[field].setdefault(value, []).append(record)
+        for spec in resorted:
+            self._sorted_add(record, spec, tie)
+        self._tally(record, 1)
+        self._touch(record)
+
+    def _has_staged(self):
+        return self._dirty
+
+    def refresh(self):
+        """Reload from disk if the file changed since it was last seen"""
+        if self._loaded and (self._flushing or self._has_staged()):
+            # Memory is ahead of the disk; reloading would drop changes
+            # that callers are already waiting on.
+            return
+        stamp = self._file_stamp()
+        if self._loaded and stamp == self._stamp:
+            return
+        self._set_records(self._load())
+        self._stamp = self._file_stamp()
+        self._loaded = True
+
+    def read(self):
+        """
+        Return the records as a new list of shallow copies.
+
+        Endpoints decorate records they return (job_details, job_title, ...)
+        and then sometimes write the list back, so handing out the cached
+        dicts themselves would leak those edits into the cache.
+        """
+        self.refresh()
+        return [_copy(r) for r in self.records]
+
+    def get(self, record_id):
+        """Return a copy of the record with the given id, or None"""
+        self.refresh()
+        record = self._by_id.get(record_id)
+        return _copy(record) if record is not None else None
+
+    def find(self, field, value):
+        """
+        Return copies of the records whose ``field`` equals ``value``.
+
+        Uses the field's index when there is one, so the cost is the size
+        of the result; unindexed fields fall back to a scan.
+        """
+        self.refresh()
+        if field in self._indexes:
+            matches = self._indexes[field].get(value, [])
+        elif field == "id":
+            record = self._by_id.get(value)
+            matches = [record] if record is not None else []
+        else:
+            matches = [
+                r for r in self.records
+                if isinstance(r, dict) and r.get(field) == value
+            ]
+        return [_copy(r) for r in matches]
+
+    def find_in(self, field, values):
+        # One refresh for the whole batch rather than one per value
+        self.refresh()
+        if field in self._indexes:
+            index = self._indexes[field]
+            return [_copy(r) for value in dict.fromkeys(values) for r in index.get(value, ())]
+        if field == "id":
+            return [_copy(self._by_id[value]) for value in dict.fromkeys(values) if value in self._by_id]
+        return super().find_in(field, values)
+
+    def count(self):
+        self.refresh()
+        return len(self.records)
+
+    def tallies(self, name, groups):
+        self.refresh()
+        totals = self._tallies[name]
+        return {group: totals[group] for group in map(tuple, groups) if group in totals}
+
+    def version(self, field=None, value=None):
+        self.refresh()
+        if field is None:
+            version = self._version
+        elif field in self._indexes:
+            version = self._slice_versions.get((field, value), 0)
+        else:
+            raise StorageError(f"No index on {field} in {self.filename}")
+        # A reload or replace starts the slices over, under a new generation
+        return f"{_PROCESS_TOKEN}.{self.generation}.{version}"
+
+    def page(self, field, value, order_by=None, limit=20, after=None):
+        self.refresh()
+        spec = (field, order_by)
+        if spec not in self._sorted:
+            raise StorageError(f"No sorted index on {spec} in {self.filename}")
+        keys = self._sorted[spec].get(value if field else None, [])
+        descending = self._sort_specs[spec][1]
+        if after is not None and len(after) != 3:
+            raise ValueError("Invalid page key")
+        try:
+            if descending:
+                end = len(keys) if after is None else bisect.bisect_left(keys, tuple(after))
+                start = max(end - limit, 0)
+                page_keys = keys[start:end][::-1]
+                more = start > 0
+            else:
+                start = 0 if after is None else bisect.bisect_right(keys, tuple(after))
+                page_keys = keys[start:start + limit]
+                more = start + limit < len(keys)
+        except TypeError:
+            raise ValueError("Invalid page key")
+        records = [_copy(self._by_tie[(abs(key[1]), abs(key[2]))]) for key in page_keys]
+        return records, (list(page_keys[-1]) if more and page_keys else None)
+
+    def next_id(self):
+        """Allocate the next id for a new record"""
+        self.refresh()
+        return _sequences.next_id(self)
+
+    # -- mutations (in memory, staged for the writer) --
+
+    def write(self, data):
+        """Replace all records"""
+        self._set_records([_copy(r) for r in data])
+        self._loaded = True
+        self._dirty = True
+
+    def insert(self, record):
+        """Append one record"""
+        self.refresh()
+        record = _copy(record)
+        self.records.append(record)
+        if "id" in record:
+            self._by_id[record["id"]] = record
+            self.max_id = max(self.max_id, _numeric_id(record))
+        self._index_add(record)
+        self._touch(record)
+        self._dirty = True
+
+    def update_many(self, updates):
+        """
+        Apply ``(record_id, changes)`` pairs to existing records.
+
+        Returns the number of records that were found and updated.
+        """
+        self.refresh()
+        updated = 0
+        for record_id, changes in updates:
+            record = self._by_id.get(record_id)
+            if record is not None:
+                self._apply_changes(record, changes)
+                updated += 1
+        if updated:
+            self._dirty = True
+        return updated
+
+    def upsert(self, field, record, defaults=None):
+        """
+        Update the first record whose ``field`` equals ``record[field]``
+        with the fields of ``record``, or insert ``record`` - plus
+        ``defaults``, fields only a new record gets - if there is none.
+        """
+        self.refresh()
+        value = record.get(field)
+        if field in self._indexes:
+            existing = next(iter(self._indexes[field].get(value, ())), None)
+        else:
+            existing = next(
+                (r for r in self.records if isinstance(r, dict) and r.get(field) == value), None
+            )
+        if existing is None:
+            self.insert({**(defaults or {}), **record})
+            return
+        changes = {k: v for k, v in record.items() if k != "id"}
+        if "id" in existing:
+            self.update_many([(existing["id"], changes)])
+        else:
+            # Records without an id can only be rewritten with the file
+            self._apply_changes(existing, changes)
+            self._dirty = True
+
+    def _remove_records(self, record_ids):
+        removed = []
+        for record_id in dict.fromkeys(record_ids):
+            record = self._by_id.pop(record_id, None)
+            if record is not None:
+                self._index_remove(record)
+                self._touch(record)
+                removed.append(record)
+        if removed:
+            gone = {id(r) for r in removed}
+            self.records = [r for r in self.records if id(r) not in gone]
+        return removed
+
+    def delete_many(self, record_ids):
+        """
+        Remove the records with the given ids.
+
+        Returns the number of records that were found and removed.
+        """
+        self.refresh()
+        removed = self._remove_records(record_ids)
+        if removed:
+            self._dirty = True
+        return len(removed)
+
+    # -- persistence --
+
+    def _prepare_records(self):
+        # Runs on the event loop, so the records can't change while they
+        # are being serialized; only the disk I/O is moved to a thread.
+        if not self._dirty:
+            return None
+        self._dirty = False
+        return dumps_bytes(self.records)
+
+    def _write_records(self, payload):
+        atomic_write(self.path, payload)
+
+    def _after_write_records(self, payload):
+        self._stamp = self._file_stamp()
+
+    def _prepare_flush(self):
+        return self._prepare_records()
+
+    def _flush(self, payload):
+        # Ids must be durable before any record that uses them
+        _sequences.flush()
+        self._write_records(payload)
+
+    def _after_flush(self, payload):
+        self._after_write_records(payload)
+
+    def _discard_staged(self):
+        # After a failed write memory may hold changes the disk never got;
+        # drop them and reload the last durable state on the next read.
+        self._dirty = False
+        self._loaded = False
+
+
+class JournalCollection(Collection):
+    """
+    A collection stored as ``<name>.json`` plus ``<name>.journal``.
+
+    The ``.json`` file is a regular snapshot in the same format as every
+    other data file. Inserts, updates and deletes are appended to the
+    journal as one NDJSON line each, so the disk write costs O(1)
+    regardless of collection size.
+    Loading reads the snapshot and replays the journal on top; once the
+    journal grows past COMPACT_EVERY entries it is folded back into the
+    snapshot.
+    """
+
+    COMPACT_EVERY = 1000
+
+    def __init__(self, filename, data_folder=DATA_FOLDER, indexed_fields=()):
+        super().__init__(filename, data_folder, indexed_fields)
+        self.journal_path = os.path.splitext(self.path)[0] + ".journal"
+        self._journal_entries = 0
+        self._pending = []
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.journal_path)
+            journal = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            journal = None
+        return (super()._file_stamp(), journal)
+
+    @staticmethod
+    def _apply(records, by_id, entry):
+        op = entry.get("op")
+        if op == "insert":
+            record = entry["record"]
+            existing = by_id.get(record.get("id"))
+            if existing is not None:
+                # Replaying an insert that already reached the snapshot
+                existing.clear()
+                existing.update(record)
+            else:
+                records.append(record)
+                if "id" in record:
+                    by_id[record["id"]] = record
+        elif op == "update":
+            record = by_id.get(entry.get("id"))
+            if record is not None:
+                record.update(entry.get("changes", {}))
+        elif op == "delete":
+            record = by_id.pop(entry.get("id"), None)
+            if record is not None:
+                records[:] = [r for r in records if r is not record]
+
+    def _load(self):
+        records = super()._load()
+        by_id = {r["id"]: r for r in records if isinstance(r, dict) and "id" in r}
+        self._journal_entries = 0
+        self._pending = []
+
+        if not os.path.exists(self.journal_path):
+            return records
+
+        try:
+            with open(self.journal_path, "rb+") as f:
+                content = f.read()
+                complete, _, torn = content.rpartition(b"\n")
+                if torn:
+                    # A crash mid-append left a partial last line; cut it off
+                    # so the next append starts on a clean line.
+                    print(f"Dropping torn journal entry in {self.journal_path}")
+                    f.truncate(len(complete) + 1 if complete else 0)
+        except Exception as e:
+            raise StorageError(f"Error reading journal {self.journal_path}: {str(e)}")
+
+        for line in complete.split(b"\n"):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = loads(line)
+            except json.JSONDecodeError:
+                print(f"Ignoring corrupt journal entry in {self.journal_path}")
+                continue
+            self._apply(records, by_id, entry)
+            self._journal_entries += 1
+
+        return records
+
+    def _stage(self, entries):
+        self._pending.extend(dumps_bytes(e) for e in entries)
+        self._journal_entries += len(entries)
+        if self._journal_entries >= self.COMPACT_EVERY:
+            self._dirty = True
+
+    def compact(self):
+        """Fold the journal into the snapshot on the next flush"""
+        self.refresh()
+        self._dirty = True
+
+    def write(self, data):
+        super().write(data)
+        self._pending = []
+
+    def insert(self, record):
+        self.refresh()
+        record = _copy(record)
+        self.records.append(record)
+        if "id" in record:
+            self._by_id[record["id"]] = record
+            self.max_id = max(self.max_id, _numeric_id(record))
+        self._index_add(record)
+        self._touch(record)
+        self._stage([{"op": "insert", "record": record}])
+
+    def update_many(self, updates):
+        self.refresh()
+        entries = []
+        for record_id, changes in updates:
+            record = self._by_id.get(record_id)
+            if record is None:
+                continue
+            self._apply_changes(record, changes)
+            entries.append({"op": "update", "id": record_id, "changes": changes})
+        if entries:
+            self._stage(entries)
+        return len(entries)
+
+    def delete_many(self, record_ids):
+        self.refresh()
+        removed = self._remove_records(record_ids)
+        if removed:
+            self._stage([{"op": "delete", "id": r["id"]} for r in removed])
+        return len(removed)
+
+    def _prepare_records(self):
+        if self._dirty:
+            # The snapshot will contain everything staged so far
+            self._pending = []
+            return ("snapshot", super()._prepare_records())
+        if self._pending:
+            lines, self._pending = self._pending, []
+            return ("append", b"".join(line + b"\n" for line in lines))
+        return None
+
+    def _write_records(self, payload):
+        kind, content = payload
+        if kind == "snapshot":
+            atomic_write(self.path, content)
+            # Entries already in the snapshot replay idempotently, so a
+            # crash between the rename and this truncate loses nothing.
+            with open(self.journal_path, "w") as f:
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with open(self.journal_path, "ab") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _after_write_records(self, payload):
+        if payload[0] == "snapshot":
+            self._journal_entries = len(self._pending)
+        super()._after_write_records(payload)
+
+    def _has_staged(self):
+        return self._dirty or bool(self._pending)
+
+    def _discard_staged(self):
+        self._pending = []
+        super()._discard_staged()
+
+
+_collections = {}
+_sequences = SequenceStore()
+_database = None
+
+
+def _sqlite_database():
+    global _database
+    if _database is None:
+        from utils.sqlite_store import SQLiteDatabase
+        _database = SQLiteDatabase(SQLITE_PATH)
+    return _database
+
+
+def get_collection(filename):
+    """Return the shared Collection for a data file, creating it on first use"""
+    collection = _collections.get(filename)
+    if collection is None:
+        indexed_fields = INDEXED_FIELDS.get(filename, ())
+        if STORAGE_BACKEND == "sqlite":
+            from utils.sqlite_store import SQLiteCollection
+            collection = SQLiteCollection(
+                filename, _sqlite_database(), indexed_fields=indexed_fields,
+                sorted_indexes=SORTED_INDEXES.get(filename, {}),
+                unique_fields=UNIQUE_FIELDS.get(filename, ()),
+                tallies=TALLIES.get(filename, {})
+            )
+        elif filename in JOURNALED_FILES:
+            collection = JournalCollection(filename, indexed_fields=indexed_fields)
+        else:
+            collection = Collection(filename, indexed_fields=indexed_fields)
+        _collections[filename] = collection
+    return collection
+
+
+def load_collections():
+    """Load every journaled collection up front, replaying its journal"""
+    if STORAGE_BACKEND == "sqlite":
+        return
+    for filename in JOURNALED_FILES:
+        get_collection(filename).refresh()
+
+
+def flush_collections():
+    """Persist anything still staged in any collection"""
+    for collection in _collections.values():
+        try:
+            collection.flush_now()
+        except Exception as e:
+            print(f"Error flushing {collection.path}: {str(e)}")
+    try:
+        _sequences.flush()
+    except Exception as e:
+        print(f"Error flushing {_sequences.path}: {str(e)}")
+
+
+def reset_sequences():
+    """Start every id sequence over (used when all data is wiped)"""
+    if STORAGE_BACKEND == "sqlite":
+        _sqlite_database().reset_sequences()
+    else:
+        _sequences.reset()
+
+
+def read_json_file(filename):
+    """Safely read JSON file"""
+    return get_collection(filename).read()
+
+
+async def write_json_file(filename, data):
+    """Safely write JSON file"""
+    collection = get_collection(filename)
+    collection.write(data)
+    return await collection.commit()
+
+
+async def insert_record(filename, record):
+    """
+    Append a single record to a data file. Raises DuplicateError if another
+    process stored a record with the same UNIQUE_FIELDS values first.
+    """
+    collection = get_collection(filename)
+    collection.insert(record)
+    saved = await collection.commit()
+    if saved and collection.rejected(record):
+        raise DuplicateError(f"Duplicate record in {collection.path}")
+    return saved
+
+
+async def insert_records(filename, records):
+    """Append several records in a single write"""
+    collection = get_collection(filename)
+    for record in records:
+        collection.insert(record)
+    return await collection.commit()
+
+
+async def update_record(filename, record_id, changes):
+    """Update fields of a single record; returns True if it was found"""
+    return await update_records(filename, [(record_id, changes)]) > 0
+
+
+async def update_records(filename, updates):
+    """Apply a list of (record_id, changes) pairs in one write"""
+    collection = get_collection(filename)
+    updated = collection.update_many(updates)
+    if updated and not await collection.commit():
+        raise StorageError(f"Failed to write {collection.path}")
+    return updated
+
+
+async def delete_records(filename, record_ids):
+    """Remove the records with the given ids in one write"""
+    collection = get_collection(filename)
+    deleted = collection.delete_many(record_ids)
+    if deleted and not await collection.commit():
+        raise StorageError(f"Failed to write {collection.path}")
+    return deleted
+
+
+async def delete_record(filename, record_id):
+    """Remove a single record; returns True if it was found"""
+    return await delete_records(filename, [record_id]) > 0
+
+
+def compact_files(data_folder=DATA_FOLDER):
+    """
+    Rewrite every data file in ``data_folder`` in the compact format,
+    folding journals into their snapshots. Run it while the API is
+    stopped; returns {filename: record count}.
+    """
+    compacted = {}
+    for filename in sorted(os.listdir(data_folder)):
+        if not filename.endswith(".json"):
+            continue
+        if filename.startswith("_") and filename not in JOURNALED_FILES:
+            # _sequences.json and the like: plain JSON values
+            path = os.path.join(data_folder, filename)
+            with open(path, "rb") as f:
+                content = f.read().strip()
+            if content:
+                atomic_write(path, dumps_bytes(loads(content)))
+            continue
+        indexed_fields = INDEXED_FIELDS.get(filename, ())
+        if filename in JOURNALED_FILES:
+            collection = JournalCollection(filename, data_folder, indexed_fields)
+        else:
+            collection = Collection(filename, data_folder, indexed_fields)
+        records = collection.read()
+        collection.write(records)
+        collection.flush_now()
+        compacted[filename] = len(records)
+    return compacted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON storage tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact_parser = subparsers.add_parser(
+        "compact", help="rewrite indented data files compactly and fold journals"
+    )
+    compact_parser.add_argument("--models", default=DATA_FOLDER)
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        compacted = compact_files(args.models)
+        for filename, count in compacted.items():
+            print(f"{filename}: {count} records")
+        print(f"Compacted {len(compacted)} collections in {args.models}")
+
+
+if __name__ == "__main__":
+    main()
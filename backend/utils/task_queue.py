@@ -0,0 +1,259 @@
+import asyncio
+import os
+import random
+import time
+
+from config import PUBSUB_SOCKET, TASK_WORKERS
+from utils.storage import StorageError, get_collection
+
+TASKS_FILE = "_tasks.json"
+
+
+class OwnerLocks:
+    """
+    Which task owners are still running, for API workers sharing one host
+    and one SQLite database. Each queue holds an flock on
+    ``<directory>/<owner>.lock`` while it runs; a lock that can be taken
+    belongs to a process that has exited.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._held = None
+
+    def _path(self, owner):
+        return os.path.join(self.directory, f"{owner}.lock")
+
+    def hold(self, owner):
+        import fcntl
+
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(self._path(owner), "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        self._held = (owner, lock_file)
+
+    def release(self):
+        if self._held is None:
+            return
+        owner, lock_file = self._held
+        self._held = None
+        try:
+            os.unlink(self._path(owner))
+        except FileNotFoundError:
+            pass
+        lock_file.close()
+
+    def is_alive(self, owner):
+        import fcntl
+
+        try:
+            lock_file = open(self._path(owner), "r")
+        except FileNotFoundError:
+            return False
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        finally:
+            lock_file.close()
+        try:
+            os.unlink(self._path(owner))
+        except FileNotFoundError:
+            pass
+        return False
+
+    def claiming(self):
+        """Exclusive lock held while a worker claims orphaned tasks"""
+        import fcntl
+
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(os.path.join(self.directory, "claim.lock"), "a")
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        # Closing the file releases the lock
+        return lock_file
+
+
+class TaskQueue:
+    """
+    In-process background queue for side effects of requests.
+
+    enqueue() records the task in TASKS_FILE (a journaled collection, so
+    this is one batched append) and returns; ``workers`` tasks run the
+    registered handlers in the background. A failing task is retried with
+    exponential backoff up to ``max_attempts`` times and then kept in the
+    file marked "failed". Tasks still pending at shutdown or after a crash
+    are run again by start(), so handlers must be idempotent.
+
+    Every task row records the queue that owns it. With several API
+    workers (``owners`` set), start() only takes over tasks whose owner
+    has exited, so a worker never runs a task another live worker holds.
+    """
+
+    def __init__(self, filename=TASKS_FILE, workers=TASK_WORKERS, max_attempts=5,
+                 retry_delay=0.5, owners=None):
+        self.filename = filename
+        self.owner = f"{os.getpid()}-{os.urandom(4).hex()}"
+        self.owners = owners
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._handlers = {}
+        self._pending = {}
+        self._queue = None
+        self._workers = []
+        # Scheduled retries by task id, cancelled by stop()
+        self._retries = {}
+        self._processed = 0
+        self._retried = 0
+        self._failed = 0
+        self._last_lag = 0.0
+
+    def register(self, name, handler):
+        """Run ``await handler(payload)`` for tasks enqueued under ``name``"""
+        self._handlers[name] = handler
+
+    def _orphaned(self, task):
+        if self.owners is None:
+            # The only worker; whatever is left came from an earlier run
+            return True
+        owner = task.get("owner")
+        return owner is None or (owner != self.owner and not self.owners.is_alive(owner))
+
+    async def start(self):
+        """Start the workers and take over tasks whose owner has exited"""
+        self._queue = asyncio.Queue()
+        collection = get_collection(self.filename)
+        claim_lock = None
+        if self.owners is not None:
+            self.owners.hold(self.owner)
+            claim_lock = self.owners.claiming()
+        try:
+            leftovers = [
+                task for task in collection.read()
+                if task.get("status") != "failed" and self._orphaned(task)
+            ]
+            if leftovers:
+                collection.update_many([(task["id"], {"owner": self.owner}) for task in leftovers])
+                if not await collection.commit():
+                    raise StorageError("Failed to claim pending background tasks")
+        finally:
+            if claim_lock is not None:
+                claim_lock.close()
+        for task in leftovers:
+            task["owner"] = self.owner
+            self._pending[task["id"]] = task
+            self._queue.put_nowait(task["id"])
+        if self._pending:
+            print(f"Resuming {len(self._pending)} pending background tasks")
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self, timeout=5.0):
+        """Give queued tasks ``timeout`` seconds to finish, then stop the workers"""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Stopping with {len(self._pending)} background tasks pending")
+        for handle in self._retries.values():
+            # The rows stay pending and are re-queued by the next start()
+            handle.cancel()
+        self._retries = {}
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self.owners is not None:
+            # Whatever is still pending goes to the next worker to start
+            self.owners.release()
+
+    async def enqueue(self, name, payload):
+        """Durably record a task and schedule it; returns the task id"""
+        if name not in self._handlers:
+            raise ValueError(f"No handler registered for task '{name}'")
+        collection = get_collection(self.filename)
+        task = {
+            "id": collection.next_id(),
+            "name": name,
+            "payload": payload,
+            "attempts": 0,
+            "status": "pending",
+            "owner": self.owner,
+            "enqueued_at": time.time()
+        }
+        collection.insert(task)
+        if not await collection.commit():
+            raise StorageError(f"Failed to record task '{name}'")
+        self._pending[task["id"]] = task
+        self._queue.put_nowait(task["id"])
+        return task["id"]
+
+    def _requeue(self, task_id, delay):
+        loop = asyncio.get_running_loop()
+        self._retries[task_id] = loop.call_later(delay, self._retry, task_id)
+
+    def _retry(self, task_id):
+        del self._retries[task_id]
+        self._queue.put_nowait(task_id)
+
+    async def _work(self):
+        while True:
+            task_id = await self._queue.get()
+            try:
+                await self._run(task_id)
+            except Exception as e:
+                print(f"Background task {task_id} bookkeeping error: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, task_id):
+        task = self._pending.get(task_id)
+        if task is None:
+            return
+        self._last_lag = time.time() - task["enqueued_at"]
+        collection = get_collection(self.filename)
+        try:
+            await self._handlers[task["name"]](task["payload"])
+        except Exception as e:
+            task["attempts"] += 1
+            if task["attempts"] < self.max_attempts:
+                self._retried += 1
+                delay = random.uniform(0, self.retry_delay * (2 ** task["attempts"]))
+                print(f"Background task {task['name']} failed ({str(e)}), retrying in {delay:.1f}s")
+                collection.update_many([(task_id, {"attempts": task["attempts"]})])
+                await collection.commit()
+                self._requeue(task_id, delay)
+                return
+            self._failed += 1
+            del self._pending[task_id]
+            print(f"Background task {task['name']} failed for good: {str(e)}")
+            collection.update_many([(task_id, {
+                "attempts": task["attempts"],
+                "status": "failed",
+                "error": str(e)
+            })])
+            await collection.commit()
+            return
+
+        self._processed += 1
+        del self._pending[task_id]
+        collection.delete_many([task_id])
+        await collection.commit()
+
+    def metrics(self):
+        """Queue depth and lag figures for monitoring"""
+        oldest = next(iter(self._pending.values()), None)
+        return {
+            "depth": len(self._pending),
+            "oldest_task_age": round(time.time() - oldest["enqueued_at"], 3) if oldest else 0.0,
+            "last_task_lag": round(self._last_lag, 3),
+            "workers": len(self._workers),
+            "processed": self._processed,
+            "retried": self._retried,
+            "failed": self._failed
+        }
+
+
+# Shared by the endpoints in main.py; several workers coordinate through
+# lock files next to the pub/sub socket
+task_queue = TaskQueue(owners=OwnerLocks(PUBSUB_SOCKET + ".tasks") if PUBSUB_SOCKET else None)
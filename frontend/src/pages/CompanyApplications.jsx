@@ -4,11 +4,22 @@ import { useNavigate } from "react-router-dom";
 import { API_BASE_URL } from "../../config";
 import "./CompanyApplications.css";
 
+// What the page shows of each application; the interview history is
+// loaded when a candidate's details are opened
+const APPLICATION_FIELDS = [
+  "id", "job_id", "candidate_email", "status", "applied_date", "cover_letter",
+  "candidate_profile.name", "candidate_profile.skills", "latest_interview"
+].join(",");
+
+const INTERVIEW_FIELDS = [
+  "job_id", "job_title", "completed_at", "score", "max_score", "percentage", "performance", "answers"
+].join(",");
+
 export default function CompanyApplications() {
   const [user, setUser] = useState(null);
   const [jobs, setJobs] = useState([]);
   const [selectedJob, setSelectedJob] = useState(null);
-  const [applications, setApplications] = useState([]);
+  const [applicationsByJob, setApplicationsByJob] = useState({});
   const [loading, setLoading] = useState(true);
   const [stats, setStats] = useState(null);
   const [viewingCandidate, setViewingCandidate] = useState(null);
@@ -36,19 +47,19 @@ export default function CompanyApplications() {
 
   const fetchCompanyData = async (email) => {
     try {
-      // Fetch company's jobs
-      const jobsResponse = await axios.get(`${API_BASE_URL}/jobs/company/${email}`);
-      setJobs(jobsResponse.data.jobs || []);
+      // Jobs, their applications and the statistics in one request
+      const response = await axios.get(`${API_BASE_URL}/dashboard/company/${email}`, {
+        params: { fields: APPLICATION_FIELDS }
+      });
+      const companyJobs = response.data.jobs || [];
+      setJobs(companyJobs);
+      setApplicationsByJob(response.data.applications || {});
+      setStats(response.data.statistics);
       
-      if (jobsResponse.data.jobs && jobsResponse.data.jobs.length > 0) {
-        setSelectedJob(jobsResponse.data.jobs[0]);
-        fetchApplicationsForJob(jobsResponse.data.jobs[0].id);
+      if (companyJobs.length > 0) {
+        setSelectedJob(companyJobs[0]);
       }
       
-      // Fetch analytics
-      const analyticsResponse = await axios.get(`${API_BASE_URL}/analytics/company/${email}`);
-      setStats(analyticsResponse.data.statistics);
-      
     } catch (error) {
       console.error("Error fetching company data:", error);
     } finally {
@@ -56,19 +67,10 @@ export default function CompanyApplications() {
     }
   };
 
-  const fetchApplicationsForJob = async (jobId) => {
-    try {
-      const response = await axios.get(`${API_BASE_URL}/applications/job/${jobId}`);
-      setApplications(response.data.applications || []);
-    } catch (error) {
-      console.error("Error fetching applications:", error);
-      setApplications([]);
-    }
-  };
+  const applications = (selectedJob && applicationsByJob[selectedJob.id]) || [];
 
   const handleJobSelect = (job) => {
     setSelectedJob(job);
-    fetchApplicationsForJob(job.id);
   };
 
   const updateApplicationStatus = async (applicationId, newStatus) => {
@@ -84,9 +86,15 @@ export default function CompanyApplications() {
       );
       
       // Update local state
-      setApplications(prev => prev.map(app => 
-        app.id === applicationId ? { ...app, status: newStatus } : app
-      ));
+      setApplicationsByJob(prev => {
+        const updated = {};
+        for (const [jobId, jobApplications] of Object.entries(prev)) {
+          updated[jobId] = jobApplications.map(app => 
+            app.id === applicationId ? { ...app, status: newStatus } : app
+          );
+        }
+        return updated;
+      });
       
       alert(`Status updated to: ${newStatus}`);
       
@@ -118,17 +126,21 @@ export default function CompanyApplications() {
   const viewCandidateDetails = async (application) => {
     setSelectedApplication(application);
     setViewingCandidate(application);
+    setShowInterviewModal(true);
     
     try {
-      // Fetch candidate's interviews
-      const response = await axios.get(`${API_BASE_URL}/interviews/candidate/${application.candidate_email}`);
-      setCandidateInterviews(response.data.interviews || []);
+      // The candidate's interviews for any of this company's jobs, most recent first
+      const response = await axios.get(
+        `${API_BASE_URL}/interviews/candidate/${application.candidate_email}`,
+        { params: { fields: INTERVIEW_FIELDS } }
+      );
+      setCandidateInterviews(
+        (response.data.interviews || []).filter(interview => interview.job_id in applicationsByJob)
+      );
     } catch (error) {
       console.error("Error fetching candidate interviews:", error);
       setCandidateInterviews([]);
     }
-    
-    setShowInterviewModal(true);
   };
 
   const scheduleInterview = (application) => {
@@ -307,7 +319,7 @@ export default function CompanyApplications() {
                     <span className={`status ${job.status}`}>{job.status}</span>
                   </div>
                   <p className="applications-count">
-                    📄 {applications.length} applications
+                    📄 {(applicationsByJob[job.id] || []).length} applications
                   </p>
                 </div>
               ))
@@ -99,6 +99,7 @@ export default function InterviewPage() {
     const jobTitle = appData.job_details?.title || "Software Developer";
     const jobTitleLower = jobTitle.toLowerCase();
     
+    // Answers are scored against the copy of this bank in backend/utils/scoring.py
     const questionBank = {
       developer: [
         {
@@ -245,66 +246,9 @@ export default function InterviewPage() {
     setCurrentQuestionIndex(index);
   };
 
-  const calculateScore = () => {
-    let totalScore = 0;
-    let maxPossibleScore = 0;
-
-    questions.forEach((question, index) => {
-      maxPossibleScore += question.maxScore;
-      const answer = answers[index] || "";
-      
-      if (answer.trim().length > 0) {
-        let questionScore = Math.min(question.maxScore * 0.3, answer.length / 20);
-        
-        const answerLower = answer.toLowerCase();
-        question.expectedKeywords.forEach(keyword => {
-          if (answerLower.includes(keyword.toLowerCase())) {
-            questionScore += (question.maxScore * 0.7) / question.expectedKeywords.length;
-          }
-        });
-        
-        if (answer.split('.').length > 2) {
-          questionScore += question.maxScore * 0.1;
-        }
-        
-        questionScore = Math.min(questionScore, question.maxScore);
-        totalScore += questionScore;
-      }
-    });
-
-    const percentage = (totalScore / maxPossibleScore) * 100;
-    
-    let performance = "";
-    let feedback = "";
-    
-    if (percentage >= 85) {
-      performance = "Excellent";
-      feedback = "Outstanding performance! You demonstrate deep understanding of the concepts.";
-    } else if (percentage >= 70) {
-      performance = "Good";
-      feedback = "Solid performance. You show good understanding with room for improvement in some areas.";
-    } else if (percentage >= 50) {
-      performance = "Average";
-      feedback = "Decent attempt. Consider reviewing some key concepts and practicing more.";
-    } else {
-      performance = "Needs Improvement";
-      feedback = "You may need to strengthen your fundamentals and gain more practical experience.";
-    }
-
-    return {
-      totalScore: Math.round(totalScore),
-      maxPossibleScore,
-      percentage: percentage.toFixed(2),
-      performance,
-      feedback
-    };
-  };
-
   const handleCompleteInterview = async () => {
     if (!interviewStarted || !application) return;
     
-    const scoreResult = calculateScore();
-    setScore(scoreResult);
     setInterviewCompleted(true);
     
     try {
@@ -319,29 +263,30 @@ export default function InterviewPage() {
         candidate_email: user.email,
         job_id: application.job_id,
         application_id: applicationId,
-        score: scoreResult.totalScore,
-        max_score: scoreResult.maxPossibleScore,
-        percentage: scoreResult.percentage,
-        performance: scoreResult.performance,
         answers: answerData,
         time_taken: 1800 - timeRemaining
       });
       
-      // Save interview results
+      // Save interview results; the backend scores the answers
       const response = await axios.post(`${API_BASE_URL}/interviews/save`, {
         candidate_email: user.email,
         job_id: application.job_id,
         application_id: applicationId,
-        score: scoreResult.totalScore,
-        max_score: scoreResult.maxPossibleScore,
-        percentage: scoreResult.percentage,
-        performance: scoreResult.performance,
         answers: answerData,
         time_taken: 1800 - timeRemaining
       });
       
       console.log("Interview saved successfully:", response.data);
       
+      const saved = response.data.interview;
+      setScore({
+        totalScore: saved.score,
+        maxPossibleScore: saved.max_score,
+        percentage: Number(saved.percentage).toFixed(2),
+        performance: saved.performance,
+        feedback: response.data.feedback
+      });
+      
     } catch (error) {
       console.error("Error submitting interview:", error);
       alert("Error saving interview results. Please try again.");
@@ -1,18 +1,25 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import axios from "axios";
 import { useNavigate } from "react-router-dom";
 import { API_BASE_URL } from "../../config";
 import "./JobListings.css";
 
+const PAGE_SIZE = 20;
+const SEARCH_DELAY_MS = 300;
+
 export default function JobListings() {
   const [jobs, setJobs] = useState([]);
-  const [filteredJobs, setFilteredJobs] = useState([]);
+  const [totalJobs, setTotalJobs] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [searchTerm, setSearchTerm] = useState("");
   const [locationFilter, setLocationFilter] = useState("");
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedJob, setSelectedJob] = useState(null);
   const [user, setUser] = useState(null);
   const navigate = useNavigate();
+  // Only the latest search may update the list
+  const searchId = useRef(0);
 
   useEffect(() => {
     // Load user from localStorage
@@ -20,38 +27,31 @@ export default function JobListings() {
     if (storedUser) {
       setUser(JSON.parse(storedUser));
     }
-    
-    // Load jobs
-    fetchJobs();
   }, []);
 
   useEffect(() => {
-    // Filter jobs based on search term and location
-    const filtered = jobs.filter(job => {
-      const matchesSearch = !searchTerm || 
-        job.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        job.description.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        (job.tags && job.tags.some(tag => 
-          tag.toLowerCase().includes(searchTerm.toLowerCase())
-        ));
-      
-      const matchesLocation = !locationFilter || 
-        (job.location && job.location.toLowerCase().includes(locationFilter.toLowerCase()));
-      
-      return matchesSearch && matchesLocation;
-    });
-    
-    setFilteredJobs(filtered);
-  }, [searchTerm, locationFilter, jobs]);
+    // Search on the server once the user stops typing
+    const timer = setTimeout(() => fetchJobs(), SEARCH_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [searchTerm, locationFilter]);
 
-  const fetchJobs = async () => {
+  const fetchJobs = async (cursor = null) => {
+    const id = ++searchId.current;
     try {
-      setLoading(true);
-      const response = await axios.get(`${API_BASE_URL}/jobs`);
-      console.log("Jobs response:", response.data);
-      setJobs(response.data.jobs || []);
-      setFilteredJobs(response.data.jobs || []);
+      if (cursor) setLoadingMore(true);
+      const params = { limit: PAGE_SIZE };
+      if (searchTerm.trim()) params.q = searchTerm.trim();
+      if (locationFilter.trim()) params.location = locationFilter.trim();
+      if (cursor) params.cursor = cursor;
+
+      const response = await axios.get(`${API_BASE_URL}/jobs/search`, { params });
+      if (id !== searchId.current) return;
+      const page = response.data.jobs || [];
+      setJobs(prev => (cursor ? [...prev, ...page] : page));
+      setTotalJobs(response.data.total ?? page.length);
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
+      if (id !== searchId.current) return;
       console.error("Error fetching jobs:", error);
       // Fallback to sample data if API fails
       const sampleJobs = [
@@ -83,9 +83,24 @@ export default function JobListings() {
         }
       ];
       setJobs(sampleJobs);
-      setFilteredJobs(sampleJobs);
+      setTotalJobs(sampleJobs.length);
+      setNextCursor(null);
     } finally {
-      setLoading(false);
+      if (id === searchId.current) {
+        setLoading(false);
+        setLoadingMore(false);
+      }
+    }
+  };
+
+  const openJobDetails = async (job) => {
+    // Search results carry a summary; fetch the full description and requirements
+    setSelectedJob(job);
+    try {
+      const response = await axios.get(`${API_BASE_URL}/jobs/${job.id}`);
+      setSelectedJob(current => (current && current.id === job.id ? response.data.job : current));
+    } catch (error) {
+      console.error("Error fetching job details:", error);
     }
   };
 
@@ -190,14 +205,14 @@ export default function JobListings() {
 </span>
         </div>
         
-        <button className="refresh-btn" onClick={fetchJobs}>
+        <button className="refresh-btn" onClick={() => fetchJobs()}>
           🔄 Refresh
         </button>
       </div>
 
       <div className="job-stats">
         <span className="job-count">
-          {filteredJobs.length} {filteredJobs.length === 1 ? 'job' : 'jobs'} found
+          {totalJobs} {totalJobs === 1 ? 'job' : 'jobs'} found
         </span>
         {user?.type === "candidate" && (
           <button 
@@ -211,7 +226,7 @@ export default function JobListings() {
 
       {/* Jobs Grid */}
       <div className="jobs-grid">
-        {filteredJobs.length === 0 ? (
+        {jobs.length === 0 ? (
           <div className="no-jobs">
             <div className="empty-icon">📭</div>
             <h3>No jobs found</h3>
@@ -224,7 +239,7 @@ export default function JobListings() {
             </button>
           </div>
         ) : (
-          filteredJobs.map(job => (
+          jobs.map(job => (
             <div key={job.id} className="job-listing-card">
               <div className="job-card-header">
                 <div>
@@ -269,9 +284,9 @@ export default function JobListings() {
               </div>
 
               <p className="job-description">
-                {job.description.length > 120 
+                {job.summary ?? (job.description.length > 120 
                   ? `${job.description.substring(0, 120)}...` 
-                  : job.description}
+                  : job.description)}
               </p>
 
               {job.tags && job.tags.length > 0 && (
@@ -288,7 +303,7 @@ export default function JobListings() {
               <div className="job-actions">
                 <button 
                   className="view-details-btn"
-                  onClick={() => setSelectedJob(job)}
+                  onClick={() => openJobDetails(job)}
                 >
                   View Details
                 </button>
@@ -305,6 +320,18 @@ export default function JobListings() {
         )}
       </div>
 
+      {nextCursor && (
+        <div className="load-more">
+          <button
+            className="refresh-btn"
+            onClick={() => fetchJobs(nextCursor)}
+            disabled={loadingMore}
+          >
+            {loadingMore ? "Loading..." : "Load More Jobs"}
+          </button>
+        </div>
+      )}
+
       {/* Job Details Modal */}
       {selectedJob && (
         <div className="modal-overlay" onClick={() => setSelectedJob(null)}>
@@ -351,7 +378,7 @@ export default function JobListings() {
 
             <div className="modal-section">
               <h3>📝 Description</h3>
-              <p className="modal-description">{selectedJob.description}</p>
+              <p className="modal-description">{selectedJob.description ?? selectedJob.summary}</p>
             </div>
 
             <div className="modal-section">
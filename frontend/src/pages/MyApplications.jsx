@@ -4,6 +4,12 @@ import { useNavigate } from "react-router-dom";
 import { API_BASE_URL } from "../../config";
 import "./MyApplications.css";
 
+// Only what the application cards and the interview modal show
+const APPLICATION_FIELDS = [
+  "id", "job_id", "status", "applied_date", "cover_letter",
+  "job_details.id", "job_details.title", "job_details.company_email", "job_details.location"
+].join(",");
+
 export default function MyApplications() {
   const [user, setUser] = useState(null);
   const [applications, setApplications] = useState([]);
@@ -55,7 +61,9 @@ export default function MyApplications() {
 
   const fetchApplications = async (email) => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/applications/candidate/${email}`);
+      const response = await axios.get(`${API_BASE_URL}/applications/candidate/${email}`, {
+        params: { fields: APPLICATION_FIELDS }
+      });
       setApplications(response.data.applications || []);
     } catch (error) {
       console.error("Error fetching applications:", error);
@@ -73,7 +81,8 @@ export default function MyApplications() {
     }
   };
 
-  // Interview Questions based on job role
+  // Interview Questions based on job role; the server scores the answers
+  // with the same questions (QUICK_INTERVIEW_BANK in backend/utils/scoring.py)
   const getInterviewQuestions = (jobTitle) => {
     const questionsByRole = {
       "developer": [
@@ -216,86 +225,39 @@ export default function MyApplications() {
     }
   };
 
-  const calculateScore = () => {
-    let totalScore = 0;
-    let maxPossibleScore = 0;
-    
-    userAnswers.forEach((answer, index) => {
-      const question = interviewQuestions[index];
-      maxPossibleScore += question.maxScore;
-      
-      // Simple scoring based on answer length and keywords
-      if (answer.trim().length > 0) {
-        let questionScore = Math.min(question.maxScore, Math.floor(answer.length / 10));
-        
-        // Bonus for keywords
-        question.keywords.forEach(keyword => {
-          if (answer.toLowerCase().includes(keyword.toLowerCase())) {
-            questionScore += 2;
-          }
-        });
-        
-        // Cap score at max
-        questionScore = Math.min(questionScore, question.maxScore);
-        totalScore += questionScore;
-      }
-    });
-    
-    const percentage = (totalScore / maxPossibleScore) * 100;
-    
-    // Determine performance level
-    let performance = "";
-    if (percentage >= 80) {
-      performance = "Excellent";
-    } else if (percentage >= 60) {
-      performance = "Good";
-    } else if (percentage >= 40) {
-      performance = "Average";
-    } else {
-      performance = "Needs Improvement";
-    }
-    
-    return {
-      score: totalScore,
-      maxScore: maxPossibleScore,
-      percentage: percentage.toFixed(2),
-      performance
-    };
-  };
-
   const handleInterviewComplete = () => {
-    const scoreResult = calculateScore();
-    setInterviewScore(scoreResult);
     setInterviewInProgress(false);
-    
-    // Save interview results (mock API call)
-    saveInterviewResults(scoreResult);
+    saveInterviewResults();
   };
 
-  const saveInterviewResults = async (scoreResult) => {
+  const saveInterviewResults = async () => {
     try {
       const interviewData = {
         candidate_email: user.email,
         job_id: currentInterview.job_details?.id,
         application_id: currentInterview.id,
-        score: scoreResult.score,
-        max_score: scoreResult.maxScore,
-        percentage: scoreResult.percentage,
-        performance: scoreResult.performance,
         answers: userAnswers.map((answer, index) => ({
           question: interviewQuestions[index].question,
           answer: answer,
           type: interviewQuestions[index].type
         })),
-        completed_at: new Date().toISOString()
+        time_taken: 1800 - timeRemaining
       };
       
-      // Mock API call - replace with your actual endpoint
-      await axios.post(`${API_BASE_URL}/interviews/save`, interviewData);
+      const response = await axios.post(`${API_BASE_URL}/interviews/save`, interviewData);
       
-      console.log("Interview results saved successfully");
+      // Show the score the server computed and stored, so it matches what
+      // the hiring team sees
+      const saved = response.data.interview;
+      setInterviewScore({
+        score: saved.score,
+        maxScore: saved.max_score,
+        percentage: Number(saved.percentage).toFixed(2),
+        performance: saved.performance
+      });
     } catch (error) {
       console.error("Error saving interview results:", error);
+      alert("Error saving interview results. Please try again.");
     }
   };
 
@@ -30,6 +30,9 @@ export default function NotificationsPage() {
       const data = JSON.parse(event.data);
       if (data.type === "notification") {
         addNewNotification(data.data);
+      } else if (data.type === "ping") {
+        // The server closes connections that stay silent
+        socket.send(JSON.stringify({ type: "pong" }));
       }
     };
     
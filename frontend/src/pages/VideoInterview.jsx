@@ -1,5 +1,4 @@
 import React, { useState, useRef, useEffect } from "react";
-import axios from "axios";
 import { API_BASE_URL } from "../../config";
 import "./VideoInterview.css";
 
@@ -15,6 +14,57 @@ export default function VideoInterview() {
   const videoRef = useRef(null);
   const mediaRecorderRef = useRef(null);
   const chunksRef = useRef([]);
+  // Server-side session that keeps the question/answer history
+  const sessionIdRef = useRef(null);
+
+  // Reads the question from the SSE endpoint so text shows up as soon as the
+  // model produces its first token instead of after the whole completion.
+  const streamQuestion = async (candidateAnswer, onText) => {
+    const res = await fetch(`${API_BASE_URL}/interview/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        name: "Candidate",
+        job_role: jobRole,
+        answer: candidateAnswer,
+        session_id: sessionIdRef.current
+      })
+    });
+    if (!res.ok || !res.body) {
+      throw new Error(`Request failed with status ${res.status}`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let text = "";
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const events = buffer.split("\n\n");
+      buffer = events.pop();
+      for (const raw of events) {
+        const lines = raw.split("\n");
+        const eventLine = lines.find(line => line.startsWith("event: "));
+        const dataLine = lines.find(line => line.startsWith("data: "));
+        if (!eventLine || !dataLine) continue;
+
+        const event = eventLine.slice("event: ".length);
+        const data = JSON.parse(dataLine.slice("data: ".length));
+        if (event === "token") {
+          text += data.text;
+        } else if (event === "replace" || event === "done") {
+          // The server switched to a fallback question, or sent the final text
+          text = data.question;
+        }
+        onText(text);
+      }
+    }
+    return text;
+  };
 
   const startInterview = async () => {
     if (!jobRole.trim()) {
@@ -23,19 +73,26 @@ export default function VideoInterview() {
     }
 
     try {
-      const res = await axios.post(`${API_BASE_URL}/interview`, {
-        name: "Candidate",
-        job_role: jobRole,
-        answer: ""
-      });
-      
-      setCurrentQuestion(res.data.question);
-      setQuestions([{ question: res.data.question, answer: "" }]);
+      setCurrentQuestion("");
       setInterviewStarted(true);
       
       // Start camera
       startCamera();
+
+      const sessionRes = await fetch(`${API_BASE_URL}/interview/session`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ job_role: jobRole })
+      });
+      if (!sessionRes.ok) {
+        throw new Error(`Request failed with status ${sessionRes.status}`);
+      }
+      sessionIdRef.current = (await sessionRes.json()).id;
+
+      const question = await streamQuestion("", setCurrentQuestion);
+      setQuestions([{ question, answer: "" }]);
     } catch (err) {
+      setInterviewStarted(false);
       alert("Error starting interview: " + err.message);
     }
   };
@@ -94,21 +151,17 @@ export default function VideoInterview() {
     stopRecording();
     
     try {
-      const res = await axios.post(`${API_BASE_URL}/interview`, {
-        name: "Candidate",
-        job_role: jobRole,
-        answer: answer
-      });
-      
+      setCurrentQuestion("");
+      setAnswer("");
+      setVideoUrl("");
+
+      const question = await streamQuestion(answer, setCurrentQuestion);
       const newQuestion = {
-        question: res.data.question,
+        question: question,
         answer: ""
       };
       
-      setCurrentQuestion(res.data.question);
       setQuestions([...questions, newQuestion]);
-      setAnswer("");
-      setVideoUrl("");
       
       // Start recording for next question
       setTimeout(startRecording, 1000);